@@ -1,30 +1,147 @@
 import pandas as pd
 import json
+import hashlib
 import os
-from openai import OpenAI
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import httpx
+from openai import OpenAI, DefaultHttpxClient
 from dotenv import load_dotenv
 import base64
+from cache import ResponseCache
+from compaction import compact_fitment, count_tokens, COMPACT_FORMAT_NOTE, PROMPT_TOKEN_BUDGET
+from fitment import normalize_fitment, fitment_rows, year_list
 load_dotenv()
 
+# "offline" builds short descriptions from the fitment rules locally, "llm" asks GPT-4o
+SHORT_DESCRIPTION_MODES = ("offline", "llm")
+SHORT_DESCRIPTION_MODE = os.environ.get("SHORT_DESCRIPTION_MODE", "offline")
+
+DRIVE_TYPES = ("AWD", "4WD", "FWD", "RWD", "2WD")
+LUG_DETAIL = re.compile(r"\b(\d+)\s*-?\s*(Lug|Bolt|Stud)s?\b", re.IGNORECASE)
+
+# Synonyms added to the long description keywords, keyed on the upper-case category name
+CATEGORY_KEYWORDS = {
+    "WHEEL BEARING & HUB ASSEMBLY": ["Wheel Bearing and Hub Assembly", "Wheel Hub Assembly", "Hub Assembly",
+                                     "Wheel Hub", "Wheel Bearing", "Hub Bearing", "Hub Unit", "Bearing Hub"],
+    "AXLE BEARING & HUB ASSEMBLY": ["Axle Bearing and Hub Assembly", "Axle Hub Assembly", "Axle Bearing",
+                                    "Hub Assembly", "Wheel Hub", "Hub Bearing"],
+    "WHEEL BEARING": ["Wheel Bearing", "Hub Bearing", "Axle Bearing", "Bearing"],
+    "WHEEL HUB": ["Wheel Hub", "Hub", "Axle Hub", "Hub Flange"],
+    "STEERING KNUCKLE": ["Steering Knuckle", "Knuckle", "Knuckle Assembly", "Spindle", "Steering Spindle"],
+    "KNUCKLE ASSEMBLY": ["Knuckle Assembly", "Steering Knuckle", "Knuckle", "Spindle"],
+    "WHEEL SEAL": ["Wheel Seal", "Hub Seal", "Axle Seal", "Grease Seal"],
+}
+
+# What a part of each category is made up of, for the short description's "Includes" line. Only
+# categories that are assemblies by definition are listed; other categories get no such line
+CATEGORY_COMPONENTS = {
+    "WHEEL BEARING & HUB ASSEMBLY": ["Wheel Hub", "Wheel Bearing"],
+    "AXLE BEARING & HUB ASSEMBLY": ["Axle Hub", "Axle Bearing"],
+}
+
+client_lock = threading.Lock()
+shared_client = None
+response_cache = None
+
+def get_client():
+    """One OpenAI client, and its pooled HTTP connections, shared by every generator"""
+    global shared_client
+    with client_lock:
+        if shared_client is None:
+            shared_client = OpenAI(http_client=DefaultHttpxClient(
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+            ))
+        return shared_client
+
+def get_response_cache():
+    """Persistent cache of OpenAI responses, opened on first use"""
+    global response_cache
+    with client_lock:
+        if response_cache is None:
+            response_cache = ResponseCache()
+        return response_cache
+
+def create_response(model, instructions, prompt):
+    """Text response for a prompt, served from the response cache when the same request was made before"""
+    cache = get_response_cache()
+    key = cache.make_key(model, instructions, prompt, temperature=0)
+    text = cache.get(key)
+    if text is None:
+        response = get_client().responses.create(
+            model=model,
+            input=prompt,
+            instructions=instructions,
+            temperature=0,
+        )
+        text = response.output_text
+        if text:
+            cache.put(key, text)
+    return text
+
+def compact_vehicle_data(rows):
+    """Vehicle data for a prompt, compacted without losing any fitment. Returns (text, stats)
+    with compact_fitment's before/after token counts"""
+    text, stats = compact_fitment(rows)
+    return (COMPACT_FORMAT_NOTE + text if stats["compacted"] else text), stats
+
+def prompt_tokens(*parts):
+    """Tokens in the instructions and input of one request"""
+    return sum(count_tokens(part) for part in parts)
+
+def check_prompt_budget(label, stats, *parts):
+    """Raise instead of sending a request over PROMPT_TOKEN_BUDGET; the generators then fall
+    back to their rule-based output"""
+    tokens = prompt_tokens(*parts)
+    if tokens > PROMPT_TOKEN_BUDGET:
+        raise Exception(f"{label} prompt is {tokens} tokens (vehicle data compacted from {stats['before']} "
+                        f"to {stats['after']}), over the {PROMPT_TOKEN_BUDGET} token budget")
+
+def generate_listing_content(generators, on_result=None):
+    """Run several generators at once on the shared client.
+
+    generators maps an output name to (function, *args). on_result(name, value, seconds)
+    is called from a worker thread as each output finishes; a generator that raises
+    reports the exception as its value. Returns ({name: value}, {name: seconds}).
+    """
+    results = {}
+    latencies = {}
+    if not generators:
+        return results, latencies
+
+    def timed(func, args):
+        start = time.perf_counter()
+        try:
+            value = func(*args)
+        except Exception as e:
+            value = e
+        return value, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=len(generators)) as executor:
+        futures = {executor.submit(timed, spec[0], spec[1:]): name for name, spec in generators.items()}
+        for future in as_completed(futures):
+            name = futures[future]
+            results[name], latencies[name] = future.result()
+            if on_result:
+                on_result(name, results[name], latencies[name])
+
+    return results, latencies
+
 def format_vehicle_lines_from_df(df, max_len=65):
     """Format vehicle compatibility data into readable lines"""
+    table = normalize_fitment(df)
     formatted_lines = []
 
-    for _, row in df.iterrows():
-        make = str(row['Make']).upper()
-        model = str(row['Model']).upper()
-        year_range = str(row['Year']).strip()
-        position = str(row['Position']).title().strip()
-        extra = str(row['Engine']).strip()
-
+    for make, model, year_range, position, extra, start, end in zip(
+        table['Make'].str.upper(), table['Model'].str.upper(), table['Year'], table['Position'].str.title(), table['Engine'],
+        table['Year Start'], table['Year End']
+    ):
         # Expand 2017-2019 to ['2017', '2018', '2019']
-        if "-" in year_range:
-            start, end = map(int, year_range.split("-"))
-            years = [str(y) for y in range(start, end + 1)]
-        else:
-            years = [year_range.strip()]
+        years = year_list(start, end, year_range)
 
-        base = f"{make} {model} {position}"
+        base = " ".join(part for part in (make, model, position) if part)
         if extra and extra.upper() not in base.upper():
             base += f" {extra}"
 
@@ -43,11 +160,109 @@ def format_vehicle_lines_from_df(df, max_len=65):
     
     return "\n".join(formatted_lines)
 
+def position_sides(rows):
+    """(axles, sides) the fitment rows cover, in Front/Rear and Left/Right order. Sides are
+    worked out per row: a row whose position doesn't name a side fits both. When no row
+    names an axle or a side the data doesn't state a position, so there are no sides."""
+    axles, sides, named = set(), set(), set()
+    for *_, position, _ in rows:
+        words = position.title().split()
+        axles.update(axle for axle in ("Front", "Rear") if axle in words)
+        named.update(side for side in ("Left", "Right") if side in words)
+        sides.update([side for side in ("Left", "Right") if side in words] or ["Left", "Right"])
+    if not (axles or named):
+        return [], []
+    return [axle for axle in ("Front", "Rear") if axle in axles], [side for side in ("Left", "Right") if side in sides]
+
+def short_description_summary(df, category):
+    """The closing lines of a short description: positions, includes, drive/lug details and
+    compatibility. Each line only appears when the fitment data or the category states it."""
+    rows = fitment_rows(df)
+    details = " ".join(engine for *_, engine in rows)
+
+    # Positions: every axle listed; a position without a side fits both sides
+    axles, sides = position_sides(rows)
+    lines = []
+    if axles:
+        lines.append(f"{' '.join(axles)} {' '.join(sides)}, "
+                     f"{' '.join(axles)} {' '.join(side + ' Side' for side in sides)}.")
+
+    components = CATEGORY_COMPONENTS.get(" ".join(category.split()).upper()) if category else None
+    if components:
+        lines.append(f"Includes {' and '.join(components)}.")
+
+    # Drive types and lug/bolt/stud counts exactly as they appear in the fitment notes
+    fits = [drive for drive in DRIVE_TYPES if re.search(rf"\b{drive}\b", details, re.IGNORECASE)]
+    for count, kind in LUG_DETAIL.findall(details):
+        detail = f"{count} {kind.title()}"
+        if detail not in fits:
+            fits.append(detail)
+    if fits:
+        lines.append(f"Fits {' '.join(fits)}.")
+
+    makes = sorted({make.upper() for make, *_ in rows if make})
+    models = {(make.upper(), model.upper()) for make, model, *_ in rows if make and model}
+    if makes:
+        make_text = makes[0] if len(makes) == 1 else ", ".join(makes[:-1]) + " and " + makes[-1]
+        lines.append(f"Compatible with {len(models)} {make_text} {'model' if len(models) == 1 else 'models'}.")
+    return lines
+
+def build_short_description(df, category):
+    """Rule-based short description: the wrapped vehicle lines plus the summary lines"""
+    lines = [format_vehicle_lines_from_df(df)] + short_description_summary(df, category)
+    return "\n".join(line for line in lines if line)
+
+def fitment_fingerprint(df):
+    """Hash of the normalized compatibility rows; SKUs with the same fitment table share it
+    regardless of row order, case or spacing"""
+    rows = {tuple(value.upper() for value in row) for row in fitment_rows(df)}
+    return hashlib.sha256(json.dumps(sorted(rows)).encode("utf-8")).hexdigest()
+
+def vehicles_from_df(df):
+    """Turn compatibility rows into vehicle dicts with display strings for the title and image pickers"""
+    table = normalize_fitment(df)
+    
+    # Rows without a year, make or model can't be shown
+    table = table[(table['Year'] != "") & (table['Make'] != "") & (table['Model'] != "")]
+    make = table['Make'].astype(object)
+    position = table['Position'].astype(object)
+    extra_info = table['Engine'].astype(object)
+    
+    # Create display strings for different purposes
+    simple_display = make + " " + table['Model'] + " " + table['Year']  # For image generation
+    title_display = (simple_display
+                     + position.where(position == "", " " + position)
+                     + extra_info.where(extra_info == "", " " + extra_info))  # For title generation
+    
+    return pd.DataFrame({
+        'simple_display': simple_display,  # For image combo
+        'title_display': title_display,    # For title combo
+        'make': make,
+        'model': table['Model'],
+        'years': table['Year'],
+        'position': position,
+        'extra_info': extra_info,
+    }).to_dict("records")
+
+def build_manual_title(category, vehicle):
+    """Fallback title in format: Position Category | Make Model Years (extra info)"""
+    if not vehicle:
+        return ""
+    
+    title_parts = []
+    if vehicle['position']:
+        title_parts.append(vehicle['position'])
+    if category:
+        title_parts.append(category)
+    first_part = " ".join(title_parts)
+    second_part = f"{vehicle['make']} {vehicle['model']} {vehicle['years']}"
+    if vehicle['extra_info']:
+        second_part = second_part + "(" + vehicle['extra_info'] + ")"
+    return f"{first_part} | {second_part}"
+
 def ai_generate_title(category, selected_vehicle, vehicle_list):
     if "OPENAI_API_KEY" in os.environ:
         try:
-            client = OpenAI()
-            
             rules = (
                 """
                     You are writing an 80-character product listing title for an online automotive parts marketplace.
@@ -68,23 +283,19 @@ def ai_generate_title(category, selected_vehicle, vehicle_list):
                 """
             )
 
+            vehicle_data, stats = compact_vehicle_data(
+                [(v['make'], v['model'], v['years'], v['position'], v['extra_info']) for v in vehicle_list]
+            )
             prompt = (
                 f"You are generating a product listing title for a {category}.\n"
                 f"Here is the selected vehicle (if any): {selected_vehicle}\n"
                 "If no selected vehicle was provided, please choose the most popular vehicle from the vehicle list according to sales volume in the given year range.\n"
-                f"Here is the vehicle data:\n{vehicle_list}\n"
+                f"Here is the vehicle data:\n{vehicle_data}\n"
                 f"Use the formatting rules I gave you earlier."
             )
+            check_prompt_budget("Title", stats, rules, prompt)
 
-            response = client.responses.create(
-                model="gpt-4o",
-                input=prompt,
-                instructions=rules,
-                temperature=0,
-            )
-            
-            desc = response.output_text
-            return desc
+            return create_response("gpt-4o", rules, prompt)
             
         except Exception as e:
             print(f"OpenAI API failed: {e}")
@@ -92,22 +303,22 @@ def ai_generate_title(category, selected_vehicle, vehicle_list):
     else:
         return False
 
-def ai_generate_short_description(df, category):
-    """Generate short description from compatibility data"""
+def ai_generate_short_description(df, category, mode=None):
+    """Generate short description from compatibility data.
+
+    mode is "offline" (rule-based, no network) or "llm"; defaults to SHORT_DESCRIPTION_MODE.
+    """
     # Build manual fallback description
-    formatted = format_vehicle_lines_from_df(df)
-    
-    # Prepare data for AI
-    rows = []
-    for _, r in df.iterrows():
-        rows.append(f"{r['Make']} {r['Model']} {r['Year']} {r['Position']} {r['Engine']}")
-    vehicle_list = json.dumps(rows)
+    formatted = build_short_description(df, category)
+    if (mode or SHORT_DESCRIPTION_MODE) != "llm":
+        return formatted
 
     # Try to use OpenAI API
     if "OPENAI_API_KEY" in os.environ:
         try:
-            client = OpenAI()
-            
+            # Prepare data for AI: grouped by make/model with year ranges merged
+            vehicle_list, stats = compact_vehicle_data(fitment_rows(df))
+
             rules = (
                 "You are generating a short e-commerce description for a wheel hub and bearing assembly based on vehicle compatibility data.\n\n"
                 "Follow these exact instructions:\n"
@@ -153,15 +364,9 @@ def ai_generate_short_description(df, category):
                 f"Use the formatting rules I gave you earlier."
             )
 
-            response = client.responses.create(
-                model="gpt-4o",
-                input=prompt,
-                instructions=rules,
-                temperature=0,
-            )
-            
-            desc = response.output_text
-            return desc
+            check_prompt_budget("Short description", stats, rules, prompt)
+
+            return create_response("gpt-4o", rules, prompt)
             
         except Exception as e:
             print(f"OpenAI API failed: {e}")
@@ -169,97 +374,118 @@ def ai_generate_short_description(df, category):
     else:
         return formatted
 
-def ai_generate_long_description(df, part_number, alternate_numbers):
-    """Generate long description from compatibility data"""
-    # Prepare data for AI
-    rows = []
-    for _, r in df.iterrows():
-        rows.append(f"{r['Make']} {r['Model']} {r['Year']} {r['Position']} {r['Engine']}")
-    vehicle_list = json.dumps(rows)
+def keyword_phrase(text):
+    """One keyword phrase: spaces only, no commas or sentence periods (decimals like 2.0L stay)"""
+    return " ".join(re.sub(r",|\.(?!\d)", " ", str(text)).split())
 
-    # Try to use OpenAI API
-    if "OPENAI_API_KEY" in os.environ:
-        try:
-            client = OpenAI()
-            
-            rules = (
-                "You are generating a long-format, keyword-rich e-commerce description for an automotive part "
-                "(usually a wheel bearing, hub assembly, or knuckle assembly).\n\n"
-                "You are given:\n"
-                "- A list of compatible vehicles (with year, make, model, position, and trim/engine details)\n"
-                "- A list of alternate part numbers (OE, OEM, aftermarket, and supplier SKUs)\n\n"
-                "Your job is to generate a single long line of keywords, without line breaks, for use in automotive marketplaces.\n\n"
-                "Output Format:\n"
-                "- Begin with all part numbers (main part + alternates)\n"
-                "- Follow with compatible years (each year individually, e.g., 2012 2013 2014)\n"
-                "- Then add all makes and models (e.g., BMW 328i)\n"
-                "- Then add all relevant positions (Front, Rear, Left, Right, Driver, Passenger)\n"
-                "- Include drive types or trims if explicitly provided (e.g., RWD, AWD, Base, M Sport)\n"
-                "- Include any mounting specs (e.g., 12mm Bolt Mounting Dimension)\n"
-                "- Include marketing keywords and synonyms (e.g., Wheel Hub, Hub Assembly, OE Replacement, Repair Kit, etc.)\n"
-                "- End with relevant features or selling points (e.g., Pre-Greased, With ABS-- only if fact-checked, Corrosion-Resistant, Precision-Machined, 1-year warranty, 30-day returns)\n"
-                "- Make it as detailed as possible since the point of long desc is to get more people to see this listing\n\n"
-                "Constraints:\n"
-                "- DO NOT GUESS any details make sure that they are all fact checked\n"
-                "- Use title case for vehicle models and trims, but part numbers stay UPPERCASE\n"
-                "- Use spaces to separate words, no commas or periods\n"
-                "- No repeated values, combine overlapping data naturally (e.g., 2012-2016 → 2012 2013 2014 2015 2016)\n\n"
-                "Output must be a single continuous string of keywords, separated only by spaces.\n\n"
-                
-                "Example input for wheel bearing & hub assembly:\n"
-                "513359, 31206794850, 31206857230, 31206867256\n"
-                "BMW	228I	2014-2016	Front	RWD, 12mm Bolt Mounting Dimension\n"
-                "BMW	320I	2012-2016	Front	RWD, 12mm Bolt Mounting Dimension\n"
-                "BMW	328D	2014-2016	Front	RWD, 12mm Bolt Mounting Dimension\n"
-                "BMW	328I	2013-2016	Front	RWD, 12mm Bolt Mounting Dimension\n"
-                "BMW	335I	2014-2015	Front	RWD, 12mm Bolt Mounting Dimension\n"
-                "BMW	340I	2016	Front	340i Base Model, 12mm Bolt Mounting Dimension\n"
-                "BMW	428I	2014-2016	Front	RWD, 12mm Bolt Mounting Dimension\n"
-                "BMW	435I	2014-2016	Front	RWD, 12mm Bolt Mounting Dimension\n"
-                "BMW	ACTIVEHYBRID 3	2013-2015	Front	12mm Bolt Mounting Dimension\n"
-                "BMW	M235I	2014-2016	Front	RWD, 12mm Bolt Mounting Dimension\n\n"
-
-                "Example output:\n"
-                "513359 31206794850 31206857230 31206867256 WA513359 TRQ BHA513359 HUB513359 WH513359 H513359 SP513359 "
-                "2012 2013 2014 2015 2016 12 13 14 15 16 BMW 228i 320i 328d 328i 335i 340i 428i 435i ActiveHybrid 3 M235i "
-                "Front Wheel Drive RWD Rear-Wheel Drive Only 12mm Bolt Mounting Dimension Front Left Right Driver Passenger "
-                "L4 2.0L L6 3.0L Turbocharged Sedan Coupe Convertible Base Luxury Sport M Sport xDrive Where Noted "
-                "5 Bolt 5 Stud 5 Lug 4 Flange With ABS With Tone Ring Without Sensor Wire Wheel Bearing and Hub Assembly "
-                "OE Replacement HD Heavy Duty 1 Year Warranty OEM Specification OE Replacement OE Performance "
-                "Wheel Hub Hub Assembly Wheel Bearing Hub Bearing Hub Unit Axle Bearing Bearing Hub Wheel Hub Assembly Auto Hub Assembly Car Hub Assembly "
-                "Grease-packed Bearings Corrosion-Resistant Pre-Greased Precision-Machined Ready to Install Front Axle Front Hub Assembly Front Axle Bearing Assembly"
-            )
+def category_keywords(category):
+    """The category plus its synonyms from CATEGORY_KEYWORDS"""
+    key = " ".join(category.split()).upper()
+    synonyms = CATEGORY_KEYWORDS.get(key)
+    if synonyms is None:
+        synonyms = [word for name, words in CATEGORY_KEYWORDS.items() if name in key for word in words]
+    return [category] + synonyms
 
-            prompt = (
-                f"You are generating a long e-commerce description for part number {part_number}\n"
-                f"Here are the alternate numbers for that part: {alternate_numbers}\n"
-                f"Here is the vehicle data:\n{vehicle_list}\n"
-                f"Use the formatting rules I gave you earlier."
-            )
+def long_description_keywords(df, part_number, alternate_numbers, category=""):
+    """Deduplicated keyword phrases built straight from the fitment data: part numbers, years
+    (four and two digit), makes and models, positions, drive/engine details, category synonyms"""
+    table = normalize_fitment(df)
+    rows = fitment_rows(table)
 
-            response = client.responses.create(
-                model="gpt-4o",
-                input=prompt,
-                instructions=rules,
-                temperature=0,
-            )
-            
-            desc = response.output_text
-            return desc
-            
-        except Exception as e:
-            print(f"OpenAI API failed: {e}")
-            # Return a basic fallback description
-            return f"Part Number {part_number} - Compatible with multiple vehicle models. Please see compatibility chart for details."
-    else:
-        return f"Part Number {part_number} - Compatible with multiple vehicle models. Please see compatibility chart for details."
+    ranges = table[['Year Start', 'Year End']].dropna().drop_duplicates()
+    years = sorted({y for start, end in zip(ranges['Year Start'], ranges['Year End']) for y in range(start, end + 1)})
+
+    models = {}
+    for make, model, *_ in rows:
+        if make:
+            models.setdefault(make.upper(), []).append(model)
+
+    axles, sides = position_sides(rows)
+    sides += [{"Left": "Driver", "Right": "Passenger"}[side] for side in sides]
+
+    phrases = [part_number, *alternate_numbers]
+    phrases += [str(y) for y in years] + [f"{y % 100:02d}" for y in years]
+    for make, make_models in models.items():
+        phrases += [make, *make_models]
+    phrases += axles + sides
+    phrases += [part for *_, engine in rows for part in engine.split(",")]
+    if category:
+        phrases += category_keywords(category)
+
+    # One pass, keeping the first spelling of each phrase
+    keywords = {}
+    for phrase in phrases:
+        phrase = keyword_phrase(phrase)
+        if phrase and phrase.upper() not in keywords:
+            keywords[phrase.upper()] = phrase.upper() if phrase in (part_number, *alternate_numbers) else phrase
+    return list(keywords.values())
+
+def build_long_description(df, part_number, alternate_numbers, category=""):
+    """Rule-based long description: every keyword phrase on one line, separated by spaces"""
+    return " ".join(long_description_keywords(df, part_number, alternate_numbers, category))
+
+def ai_generate_long_description(df, part_number, alternate_numbers, category="", enrich=True):
+    """Generate long description from compatibility data.
+
+    The keywords are built locally; with enrich=True and an API key GPT-4o only adds
+    marketing terms and synonyms that aren't already there.
+    """
+    phrases = long_description_keywords(df, part_number, alternate_numbers, category)
+    keywords = " ".join(phrases)
+    if not enrich or "OPENAI_API_KEY" not in os.environ:
+        return keywords
+
+    try:
+        # Prepare data for AI: grouped by make/model with year ranges merged
+        vehicle_list, stats = compact_vehicle_data(fitment_rows(df))
+
+        rules = (
+            "You are adding search keywords to a long-format, keyword-rich e-commerce description for an automotive part "
+            "(usually a wheel bearing, hub assembly, or knuckle assembly).\n\n"
+            "You are given the part category, the compatible vehicles and the keywords the listing already has "
+            "(part numbers, years, makes, models, positions, drive types, mounting specs and category synonyms).\n\n"
+            "Return ONLY additional keywords, for example:\n"
+            "- Marketing keywords and synonyms buyers search for (e.g., OE Replacement, Repair Kit, Auto Hub Assembly)\n"
+            "- Body styles, trims and engines of the listed vehicles (e.g., Sedan Coupe, M Sport, L4 2.0L)\n"
+            "- Features or selling points (e.g., Pre-Greased, With ABS-- only if fact-checked, Corrosion-Resistant)\n\n"
+            "Constraints:\n"
+            "- DO NOT GUESS any details make sure that they are all fact checked\n"
+            "- Never repeat a keyword that is already in the listing\n"
+            "- Use title case, no commas or periods\n"
+            "- Separate keywords with ' | ' on a single line, with nothing before or after\n\n"
+            "Example output:\n"
+            "OE Replacement | Sedan | Coupe | Convertible | M Sport | L4 2.0L | Turbocharged | Hub Unit | Pre-Greased | Precision-Machined\n"
+        )
+
+        prompt = (
+            f"Part category: {category}\n"
+            f"Keywords already in the listing:\n{keywords}\n"
+            f"Here is the vehicle data:\n{vehicle_list}\n"
+            f"Use the formatting rules I gave you earlier."
+        )
+
+        check_prompt_budget("Long description", stats, rules, prompt)
+
+        extra = create_response("gpt-4o", rules, prompt) or ""
+
+        # Append only phrases the local builder didn't already produce
+        seen = {phrase.upper() for phrase in phrases}
+        additions = []
+        for phrase in extra.split("|"):
+            phrase = keyword_phrase(phrase)
+            if phrase and phrase.upper() not in seen:
+                seen.add(phrase.upper())
+                additions.append(phrase)
+        return " ".join([keywords] + additions)
+
+    except Exception as e:
+        print(f"OpenAI API failed: {e}")
+        return keywords
     
-def ai_generate_image(selected_vehicle, vehicle_list):
+def ai_generate_image(selected_vehicle, vehicle_list, save_path=None):
     # Try to use OpenAI API
     if "OPENAI_API_KEY" in os.environ:
         try:
-            client = OpenAI()
-
             prompt = (
                 "You are generating a high-quality vehicle image.\n"
                 "Constraints:\n"
@@ -277,15 +503,22 @@ def ai_generate_image(selected_vehicle, vehicle_list):
                 f"Here is the vehicle data:\n{vehicle_list}\n"
             )
 
-            result = client.images.generate(
-                model="gpt-image-1",
-                prompt=prompt
-            )
+            # Same vehicle list and selection -> same image, so reuse the stored bytes
+            cache = get_response_cache()
+            key = cache.make_key("gpt-image-1", None, prompt)
+            image_bytes = cache.get(key)
+            if image_bytes is None:
+                result = get_client().images.generate(
+                    model="gpt-image-1",
+                    prompt=prompt
+                )
 
-            image_base64 = result.data[0].b64_json
-            image_bytes = base64.b64decode(image_base64)
-            currentPath = os.getcwd()
-            save_path = os.path.join(os.path.join(currentPath, "results"), "vehicle_image.jpg")
+                image_base64 = result.data[0].b64_json
+                image_bytes = base64.b64decode(image_base64)
+                cache.put(key, image_bytes)
+            if save_path is None:
+                currentPath = os.getcwd()
+                save_path = os.path.join(os.path.join(currentPath, "results"), "vehicle_image.jpg")
 
             os.makedirs(os.path.dirname(save_path), exist_ok=True)
             with open(save_path, "wb") as f:
@@ -0,0 +1,261 @@
+"""Headless batch mode: build listings for a whole spreadsheet of part numbers.
+
+Usage:
+    python batch.py skus.xlsx [--storefront Karshield] [--workers 4] [--http] [--sweep] [--years bisect] [--restart]
+
+The sheet (CSV or XLSX) needs a "SKU" column. Optional columns:
+    Manufacturer    pick the listing from this manufacturer (default: first listing)
+    Specifications  yes/no, scrape the spec table (default: yes)
+    Alternates      comma separated alternate part numbers for the long description
+    Vehicle         vehicle to feature in the title/image, e.g. "BMW 328I 2013-2016"
+    Image           yes/no, generate a vehicle image (default: no)
+
+Each SKU gets its own folder under results/. A SKU whose folder already has a
+listing.json is skipped, so re-running after a crash picks up where it stopped.
+A SKU interrupted during its vehicle checks, or with vehicles that failed, resumes
+from its compatibility.journal.jsonl and only checks what's missing.
+
+With --sweep, every pending SKU's vehicle list is read first and all their engine
+checks are done together, one category page visit per vehicle engine (see sweep.py).
+
+--years picks which years of each vehicle's year range are checked on the site
+(see sampling.py); the default only checks the last year.
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import traceback
+import pandas as pd
+from dotenv import load_dotenv
+load_dotenv()
+from vehicleCompatibility import WebScraper
+from httpScraper import HttpScraper
+from browser import DriverManager
+from pipeline import run_sku_pipeline, ALL_OUTPUTS
+from sweep import sweep_fitment
+from ai import SHORT_DESCRIPTION_MODES, SHORT_DESCRIPTION_MODE
+from sampling import YEAR_STRATEGIES, YEAR_STRATEGY
+
+YES = {"y", "yes", "true", "1", "x"}
+
+# Read the SKU sheet into a list of row dicts with lower-case column names
+def read_sku_sheet(path):
+    if path.lower().endswith(".csv"):
+        df = pd.read_csv(path, dtype=str)
+    else:
+        df = pd.read_excel(path, dtype=str)
+    df.columns = [str(c).strip().lower() for c in df.columns]
+
+    if "sku" not in df.columns:
+        raise Exception(f"{path} has no SKU column")
+
+    rows = []
+    for record in df.to_dict("records"):
+        row = {k: ("" if pd.isna(v) else str(v).strip()) for k, v in record.items()}
+        if row["sku"]:
+            rows.append(row)
+    return rows
+
+# Read a yes/no column, falling back to the default when it's blank
+def flag(row, column, default):
+    value = row.get(column, "")
+    return value.lower() in YES if value else default
+
+# Folder name for a SKU under results/
+def sku_folder_name(sku):
+    return re.sub(r"[^\w.-]", "_", sku)
+
+# Pick the listing for this row: matching manufacturer and exact part number if we can
+def choose_product(products, row):
+    manufacturer = row.get("manufacturer", "").upper()
+    sku = row["sku"].upper()
+
+    candidates = [i for i, p in enumerate(products)
+                  if not manufacturer or p['manufacturer'].upper() == manufacturer]
+    if not candidates:
+        raise Exception(f"No {row.get('manufacturer')} listing for SKU {row['sku']}")
+
+    for i in candidates:
+        if products[i]['part_number'].upper() == sku:
+            return i
+    return candidates[0]
+
+# Read every pending SKU's buyer's guide, then check all their vehicles in one sweep
+def sweep_skus(scraper, rows):
+    parts = []
+    for row in rows:
+        try:
+            products = scraper.search_products(row["sku"])
+            part_number, manufacturer, category, vehicles = scraper.read_buyers_guide(choose_product(products, row))
+            parts.append({
+                'part_number': part_number,
+                'manufacturer': manufacturer,
+                'category': category,
+                'vehicles': vehicles,
+            })
+        except Exception as e:
+            print(f"{row['sku']}: left out of the sweep: {e}")
+
+    stats = sweep_fitment(scraper, parts)
+    print(f"Sweep: {stats['pages']} category pages for {stats['pending']} engine checks "
+          f"({stats['checks']} in total, {stats['failed']} pages failed)")
+
+def write_text(folder, filename, text):
+    with open(os.path.join(folder, filename), "w", encoding="utf-8") as f:
+        f.write(text or "")
+
+# Run search, specifications, compatibility and AI text for one SKU.
+# shared_content carries titles/short descriptions between SKUs with the same fitment table.
+def process_sku(scraper, row, folder, shared_content=None, short_description_mode=None):
+    sku = row["sku"]
+    scraper.set_results_folder(folder)
+
+    products = scraper.search_products(sku)
+    index = choose_product(products, row)
+    product = products[index]
+
+    # Specifications alongside compatibility, then all AI outputs at once
+    outputs = [name for name in ALL_OUTPUTS if name != "image" or flag(row, "image", False)]
+    results = asyncio.run(run_sku_pipeline(
+        scraper, index,
+        specs_index=index if flag(row, "specifications", True) else None,
+        part_number=product['part_number'],
+        category=product['category'],
+        alternate_numbers=[a.strip() for a in re.split(r"[,\n]", row.get("alternates", "")) if a.strip()],
+        selected_vehicle=row.get("vehicle", ""),
+        outputs=outputs,
+        shared=shared_content,
+        short_description_mode=short_description_mode
+    ))
+
+    write_text(folder, "compatibility.txt", results["compatibility"].text)
+
+    # A generator that failed hands back its exception: save what worked, then raise it
+    failed = [(name, results[name]) for name in outputs if isinstance(results.get(name), Exception)]
+    for name in ("title", "short_description", "long_description"):
+        if not isinstance(results.get(name), Exception):
+            write_text(folder, f"{name}.txt", results.get(name))
+
+    for name, error in failed[1:]:
+        print(f"{sku}: could not generate {name.replace('_', ' ')}: {error}")
+    if failed:
+        name, error = failed[0]
+        raise Exception(f"Could not generate {name.replace('_', ' ')}: {error}") from error
+
+    return {
+        'sku': sku,
+        'part_number': product['part_number'],
+        'manufacturer': product['manufacturer'],
+        'category': product['category'],
+        'vehicles': len(results["vehicles"]),
+        'fingerprint': results["fingerprint"],
+        'reused': results["reused"],
+        'image': results.get("image") or None,
+        'timings': results["timings"],
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build listings for a spreadsheet of SKUs")
+    parser.add_argument("sheet", help="CSV or XLSX with a SKU column")
+    parser.add_argument("--storefront", default="Karshield", choices=["Autofirst", "Karshield", "365Hubs"])
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="browser sessions for vehicle checks")
+    parser.add_argument("--http", action="store_true", help="use the HTTP fast path where possible")
+    parser.add_argument("--show-browser", action="store_true", help="don't run Chrome headless")
+    parser.add_argument("--all-resources", action="store_true",
+                        help="load images, fonts and third-party scripts too")
+    parser.add_argument("--bypass-cache", action="store_true", help="re-check every engine on the site")
+    parser.add_argument("--sweep", action="store_true",
+                        help="check all SKUs' vehicles together, one page visit per vehicle engine")
+    parser.add_argument("--years", choices=YEAR_STRATEGIES, default=YEAR_STRATEGY,
+                        help="which years of each vehicle's range to check: end, ends, bisect or all")
+    parser.add_argument("--short-description", choices=SHORT_DESCRIPTION_MODES, default=SHORT_DESCRIPTION_MODE,
+                        help="build short descriptions locally (offline) or with GPT-4o (llm)")
+    parser.add_argument("--restart", action="store_true", help="redo SKUs that already finished")
+    parser.add_argument("--results", default=os.path.join(os.getcwd(), "results"), help="output folder")
+    args = parser.parse_args(argv)
+
+    rows = read_sku_sheet(args.sheet)
+    scraper_class = HttpScraper if args.http else WebScraper
+
+    # Warm browser sessions shared by every SKU; crashed or worn-out ones get replaced
+    driver_manager = DriverManager()
+    if not args.http:
+        driver_manager.prewarm(max(1, args.workers), headless=not args.show_browser)
+
+    def new_scraper():
+        return scraper_class(
+            storefront=args.storefront,
+            headless=not args.show_browser,
+            status_callback=print,
+            workers=args.workers,
+            bypass_cache=args.bypass_cache,
+            driver_manager=driver_manager,
+            resource_filter=not args.all_resources,
+            year_strategy=args.years,
+            priority="batch"
+        )
+
+    # One scraper (and its worker pool) is reused for every SKU
+    scraper = None
+    shared_content = {}
+    failed = []
+
+    def marker_path(row):
+        return os.path.join(args.results, sku_folder_name(row["sku"]), "listing.json")
+
+    # Finished, unless vehicles failed and its compatibility journal is still waiting on them
+    def finished(row):
+        folder = os.path.join(args.results, sku_folder_name(row["sku"]))
+        return (os.path.exists(marker_path(row))
+                and not os.path.exists(os.path.join(folder, "compatibility.journal.jsonl")))
+
+    try:
+        if args.sweep:
+            scraper = new_scraper()
+            try:
+                sweep_skus(scraper, [row for row in rows if args.restart or not finished(row)])
+            except Exception as e:
+                # Whatever the sweep didn't cache gets checked per SKU below
+                print(f"Sweep failed, checking SKUs one at a time: {e}")
+
+        for n, row in enumerate(rows, start=1):
+            folder = os.path.join(args.results, sku_folder_name(row["sku"]))
+            marker = marker_path(row)
+            if finished(row) and not args.restart:
+                print(f"[{n}/{len(rows)}] {row['sku']}: already done, skipping")
+                continue
+
+            print(f"[{n}/{len(rows)}] {row['sku']}")
+            try:
+                if scraper is None:
+                    scraper = new_scraper()
+                summary = process_sku(scraper, row, folder, shared_content, args.short_description)
+                if summary['reused']:
+                    print(f"{row['sku']}: same fitment as an earlier SKU, reused {', '.join(summary['reused'])}")
+                with open(marker, "w", encoding="utf-8") as f:
+                    json.dump(summary, f, indent=2)
+            except Exception as e:
+                print(f"{row['sku']} failed: {e}")
+                failed.append(row["sku"])
+                os.makedirs(folder, exist_ok=True)
+                write_text(folder, "error.txt", traceback.format_exc())
+
+                # Hand the browsers back; the manager drops any that crashed
+                if scraper:
+                    scraper.close()
+                scraper = None
+    finally:
+        if scraper:
+            scraper.close()
+        driver_manager.shutdown()
+
+    print(f"Finished {len(rows) - len(failed)}/{len(rows)} SKUs")
+    if failed:
+        print("Failed: " + ", ".join(failed))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
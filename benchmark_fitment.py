@@ -0,0 +1,103 @@
+"""Benchmark: iterrows() cleanup vs normalize_fitment() on a synthetic fitment table.
+
+Usage:
+    python benchmark_fitment.py [--rows 10000] [--repeat 3]
+
+Times the old per-row str()/pd.isna cleanup and year parsing against one
+normalize_fitment() pass shared by the vehicle lines, vehicle picker and fingerprint.
+"""
+import argparse
+import random
+import time
+import pandas as pd
+from fitment import normalize_fitment
+from ai import format_vehicle_lines_from_df, vehicles_from_df, fitment_fingerprint
+
+MAKES = {
+    "BMW": ["228I", "320I", "328I", "335I", "428I", "M235I"],
+    "TOYOTA": ["CAMRY", "COROLLA", "RAV4", "HIGHLANDER", "TACOMA"],
+    "FORD": ["F-150", "ESCAPE", "FUSION", "EXPLORER"],
+    "HONDA": ["ACCORD", "CIVIC", "CR-V", "PILOT"],
+}
+POSITIONS = ["Front", "Rear", "Front Left", "Front Right", None]
+ENGINES = ["RWD", "AWD", "FWD, 2.5L L4", "4WD, 3.5L V6", "12mm Bolt Mounting Dimension", None]
+
+# Random compatibility table shaped like compatibility.xlsx, with the mixed year types and NaNs read_excel produces
+def synthetic_table(rows, seed=1):
+    rng = random.Random(seed)
+    records = []
+    for _ in range(rows):
+        make = rng.choice(list(MAKES))
+        start = rng.randint(1998, 2022)
+        span = rng.choice([0, 0, 1, 2, 3, 5])
+        records.append({
+            'Make': make if rng.random() > 0.01 else None,
+            'Model': rng.choice(MAKES[make]),
+            'Year': start if span == 0 else f"{start}-{start + span}",
+            'Position': rng.choice(POSITIONS),
+            'Engine': rng.choice(ENGINES),
+        })
+    return pd.DataFrame(records)
+
+# The cleanup every consumer used to repeat, one row at a time
+def legacy_consumers(df):
+    lines = []
+    for _, row in df.iterrows():
+        year_range = str(row['Year']).strip()
+        if "-" in year_range:
+            start, end = map(int, year_range.split("-"))
+            years = [str(y) for y in range(start, end + 1)]
+        else:
+            years = [year_range]
+        lines.append(f"{' '.join(years)} {str(row['Make']).upper()} {str(row['Model']).upper()} "
+                     f"{str(row['Position']).title().strip()} {str(row['Engine']).strip()}")
+
+    vehicles = []
+    for _, row in df.iterrows():
+        if pd.isna(row['Year']) or pd.isna(row.get('Make')) or pd.isna(row.get('Model')):
+            continue
+        position = "" if pd.isna(row['Position']) else str(row['Position'])
+        extra = "" if pd.isna(row['Engine']) else str(row['Engine'])
+        vehicles.append(f"{row['Make']} {row['Model']} {row['Year']} {position} {extra}")
+
+    fingerprint = set()
+    for _, row in df.iterrows():
+        fingerprint.add(tuple("" if pd.isna(row.get(c)) else " ".join(str(row.get(c)).split()).upper()
+                              for c in ('Make', 'Model', 'Year', 'Position', 'Engine')))
+    return lines, vehicles, fingerprint
+
+def normalized_consumers(df):
+    table = normalize_fitment(df)
+    return format_vehicle_lines_from_df(table), vehicles_from_df(table), fitment_fingerprint(table)
+
+def best_of(func, df, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark fitment table normalization")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    df = synthetic_table(args.rows)
+
+    start = time.perf_counter()
+    normalize_fitment(df)
+    normalize_time = time.perf_counter() - start
+
+    legacy = best_of(legacy_consumers, df, args.repeat)
+    normalized = best_of(normalized_consumers, df, args.repeat)
+
+    print(f"{args.rows} rows, best of {args.repeat}")
+    print(f"  normalize_fitment alone:         {normalize_time * 1000:8.1f} ms")
+    print(f"  iterrows cleanup (3 consumers):  {legacy * 1000:8.1f} ms")
+    print(f"  normalized (3 consumers):        {normalized * 1000:8.1f} ms")
+    print(f"  speedup:                         {legacy / normalized:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+import os
+import json
+import queue
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from fake_useragent import UserAgent
+import undetected_chromedriver as uc
+from webdriver_manager.chrome import ChromeDriverManager
+from cache import CACHE_FOLDER
+
+BROWSER_SETUP_PATH = os.path.join(CACHE_FOLDER, "browser.json")
+
+# Latest chromedriver release for a major version: Chrome for Testing from 115 on, the old
+# chromedriver storage before that
+LATEST_RELEASE_URLS = (
+    (115, "https://googlechromelabs.github.io/chrome-for-testing/LATEST_RELEASE_{}"),
+    (0, "https://chromedriver.storage.googleapis.com/LATEST_RELEASE_{}"),
+)
+
+# Used when there's no cached list and fake_useragent can't reach its data
+DEFAULT_USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
+]
+
+# Resource types and third-party domains we never read anything from
+IMAGES = ["*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico"]
+FONTS = ["*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot"]
+THIRD_PARTY = [
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*googleadservices.com*", "*facebook.net*", "*facebook.com/tr*", "*bing.com*", "*criteo.*",
+    "*hotjar.com*", "*newrelic.com*", "*nr-data.net*", "*adsrvr.org*", "*pinterest.com*",
+]
+
+# URL patterns blocked per page type when resource filtering is on. Only rockauto's
+# own scripts are kept: the buyer's-guide popup, autosuggest and catalog tree need them.
+BLOCK_PROFILES = {
+    "search": IMAGES + FONTS + THIRD_PARTY,
+    "catalog": IMAGES + FONTS + THIRD_PARTY,
+    "moreinfo": IMAGES + FONTS + THIRD_PARTY + ["*.css"],
+}
+
+browser_setup_lock = threading.Lock()
+browser_setup = None
+
+# ChromeDriverManager wants a full driver version; resolve a bare major version like "124"
+# to its latest release ("124.0.6367.207"). Full versions are passed through.
+def full_driver_version(version):
+    if not version or "." in version:
+        return version
+    url = next(url for first, url in LATEST_RELEASE_URLS if int(version) >= first)
+    response = requests.get(url.format(version), timeout=15)
+    response.raise_for_status()
+    return response.text.strip()
+
+class DriverPool:
+    """Shares work out across a fixed set of WebScraper workers, one browser each"""
+
+    def __init__(self, scrapers):
+        self.scrapers = list(scrapers)
+        self.idle = queue.Queue()
+        for scraper in self.scrapers:
+            self.idle.put(scraper)
+
+    def __len__(self):
+        return len(self.scrapers)
+
+    # Run func(scraper, item) for every item, returning results in the original item order
+    def map(self, func, items):
+        items = list(items)
+        if len(self.scrapers) <= 1 or len(items) <= 1:
+            return [self.run(func, item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=len(self.scrapers)) as executor:
+            return list(executor.map(lambda item: self.run(func, item), items))
+
+    # Borrow an idle scraper for a single call
+    def run(self, func, item):
+        scraper = self.idle.get()
+        try:
+            return func(scraper, item)
+        finally:
+            self.idle.put(scraper)
+
+# Resolve the chromedriver binary and user-agent list once, caching them under cache/.
+# CHROMEDRIVER_PATH points at a driver already on disk; CHROME_VERSION pins the major
+# version (or a full driver version), and a cached driver for a different version is
+# resolved again.
+def get_browser_setup():
+    global browser_setup
+    with browser_setup_lock:
+        if browser_setup is not None:
+            return browser_setup
+        
+        pinned = os.environ.get("CHROME_VERSION", "").strip() or None
+        setup = {}
+        if os.path.exists(BROWSER_SETUP_PATH):
+            try:
+                with open(BROWSER_SETUP_PATH, encoding="utf-8") as f:
+                    setup = json.load(f)
+            except (OSError, ValueError):
+                setup = {}
+        
+        driver_path = os.environ.get("CHROMEDRIVER_PATH")
+        if not driver_path:
+            driver_path = setup.get("driver_path")
+            if not (driver_path and os.path.exists(driver_path) and setup.get("chrome_version") == pinned):
+                # Only network round-trip: first run, or the pinned version changed
+                driver_path = ChromeDriverManager(driver_version=full_driver_version(pinned)).install()
+        
+        user_agents = setup.get("user_agents")
+        if not user_agents:
+            try:
+                ua = UserAgent(browsers=["Chrome"])
+                user_agents = sorted({ua.random for _ in range(25)})
+            except Exception:
+                user_agents = DEFAULT_USER_AGENTS
+        
+        browser_setup = {"driver_path": driver_path, "chrome_version": pinned, "user_agents": user_agents}
+        try:
+            os.makedirs(CACHE_FOLDER, exist_ok=True)
+            with open(BROWSER_SETUP_PATH, "w", encoding="utf-8") as f:
+                json.dump(browser_setup, f, indent=2)
+        except OSError:
+            pass
+        return browser_setup
+
+# Start a new undetected Chrome session
+def create_driver(headless=False):
+    setup = get_browser_setup()
+    options = uc.ChromeOptions()
+    options.add_argument(f'user-agent={random.choice(setup["user_agents"])}')
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    
+    if headless:
+        options.add_argument("--headless")
+    
+    # Handing uc the driver binary stops it looking one up online
+    version_main = int(setup["chrome_version"].split(".")[0]) if setup["chrome_version"] else None
+    return uc.Chrome(options=options, driver_executable_path=setup["driver_path"], version_main=version_main)
+
+# Block URL patterns in a session through the DevTools protocol (empty list unblocks)
+def set_blocked_urls(driver, patterns):
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+# Bytes transferred by the current page and its resources, from the Resource Timing API
+def page_bytes(driver):
+    return driver.execute_script("""
+        var total = 0;
+        performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'))
+            .forEach(function (entry) { total += entry.transferSize || 0; });
+        return total;
+    """) or 0
+
+class DriverManager:
+    """Keeps Chrome sessions warm between WebScraper instances.
+
+    acquire() hands out an idle session (health-checked) or starts a new one, and
+    release() puts it back. A session is quit instead of reused once it has loaded
+    max_pages pages, when it fails its health check, or when it is released as broken.
+    """
+
+    def __init__(self, max_pages=300, max_idle=8):
+        self.max_pages = max_pages
+        self.max_idle = max_idle
+        self.lock = threading.Lock()
+        self.idle = {False: [], True: []}  # headless flag -> idle sessions
+        self.pages = {}  # id(driver) -> pages loaded
+        self.headless = {}  # id(driver) -> headless flag
+
+    # Hand out a healthy session, starting one if none are idle
+    def acquire(self, headless=False):
+        while True:
+            with self.lock:
+                driver = self.idle[headless].pop() if self.idle[headless] else None
+            
+            if driver is None:
+                driver = create_driver(headless)
+                with self.lock:
+                    self.pages[id(driver)] = 0
+                    self.headless[id(driver)] = headless
+                return driver
+            
+            if self.is_healthy(driver):
+                return driver
+            self.discard(driver)
+
+    # Take a session back, keeping it warm unless it's worn out or broken
+    def release(self, driver, broken=False):
+        if driver is None:
+            return
+        
+        with self.lock:
+            headless = self.headless.get(id(driver), False)
+            keep = (not broken
+                    and self.pages.get(id(driver), 0) < self.max_pages
+                    and len(self.idle[headless]) < self.max_idle)
+        
+        if keep and self.is_healthy(driver):
+            with self.lock:
+                self.idle[headless].append(driver)
+        else:
+            self.discard(driver)
+
+    # Count a page load against the session's recycle budget
+    def record_page(self, driver):
+        with self.lock:
+            self.pages[id(driver)] = self.pages.get(id(driver), 0) + 1
+
+    # True once a session has loaded enough pages to be replaced
+    def needs_recycle(self, driver):
+        with self.lock:
+            return self.pages.get(id(driver), 0) >= self.max_pages
+
+    def is_healthy(self, driver):
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    # Quit a session and forget about it
+    def discard(self, driver):
+        with self.lock:
+            self.pages.pop(id(driver), None)
+            self.headless.pop(id(driver), None)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    # Start sessions ahead of time so the first SKU doesn't pay for Chrome startup
+    def prewarm(self, count, headless=False):
+        with self.lock:
+            missing = count - len(self.idle[headless])
+        if missing <= 0:
+            return
+        
+        with ThreadPoolExecutor(max_workers=missing) as executor:
+            drivers = list(executor.map(lambda _: self.acquire(headless), range(missing)))
+        for driver in drivers:
+            self.release(driver)
+
+    # Quit every idle session
+    def shutdown(self):
+        with self.lock:
+            drivers = self.idle[False] + self.idle[True]
+            self.idle = {False: [], True: []}
+        for driver in drivers:
+            self.discard(driver)
@@ -0,0 +1,217 @@
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import time
+
+# Next to the code rather than the working directory, so the GUI and batch mode share one cache
+# wherever they're started from; override with CACHE_FOLDER
+CACHE_FOLDER = os.environ.get("CACHE_FOLDER") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
+# Open a SQLite database under the cache folder that worker threads can share
+def open_database(filename):
+    os.makedirs(CACHE_FOLDER, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(CACHE_FOLDER, filename), check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+class FitmentCache:
+    """Per-engine fitment results keyed on (year, make, model, engine, category, part number, manufacturer).
+
+    Stores the (engine_displacement, part_info, part_fits) tuple returned by
+    WebScraper.process_engine_compatibility. Entries older than ttl seconds are
+    treated as misses. With bypass=True lookups miss except for results this instance
+    wrote itself (e.g. by a sweep earlier in the same run), so every engine is checked
+    on the site once; fresh results are still written, which refreshes the cache.
+    """
+
+    def __init__(self, filename="fitment.sqlite3", ttl=30 * 24 * 3600, bypass=False):
+        self.ttl = ttl
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.written = set()  # keys put by this instance, trusted even when bypassing
+        self.conn = open_database(filename)
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS fitment (
+                    year TEXT, make TEXT, model TEXT, engine TEXT, category TEXT,
+                    part_number TEXT, manufacturer TEXT,
+                    engine_displacement TEXT, part_info TEXT, part_fits INTEGER,
+                    checked_at REAL,
+                    PRIMARY KEY (year, make, model, engine, category, part_number, manufacturer)
+                )
+            """)
+
+    # Normalize a key so case and stray whitespace don't cause misses
+    def make_key(self, year, make, model, engine, category, part_number, manufacturer):
+        return tuple(" ".join(str(v).split()).upper() for v in
+                     (year, make, model, engine, category, part_number, manufacturer))
+
+    # Return the cached result tuple, or None on a miss
+    def get(self, key):
+        row = None
+        with self.lock:
+            trusted = not self.bypass or key in self.written
+        if trusted:
+            with self.lock:
+                row = self.conn.execute("""
+                    SELECT engine_displacement, part_info, part_fits, checked_at FROM fitment
+                    WHERE year=? AND make=? AND model=? AND engine=? AND category=? AND part_number=? AND manufacturer=?
+                """, key).fetchone()
+
+        with self.lock:
+            if row is None or time.time() - row[3] > self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0], row[1], bool(row[2])
+
+    # Store a result tuple
+    def put(self, key, result):
+        engine_displacement, part_info, part_fits = result
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO fitment VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                key + (engine_displacement, part_info, int(bool(part_fits)), time.time())
+            )
+            self.written.add(key)
+
+    # Drop expired entries
+    def purge_expired(self):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM fitment WHERE checked_at < ?", (time.time() - self.ttl,))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class EngineIndex:
+    """Catalog autosuggest results: (site, vehicle search string) -> engine rows with catalog links.
+
+    The catalog links are absolute, so entries are kept per base URL and a scraper
+    pointed at another site or environment never gets links to the wrong host.
+    Entries expire after ttl seconds, and once more than max_entries are stored the
+    least recently used ones are evicted.
+    """
+
+    def __init__(self, filename="engines.sqlite3", ttl=90 * 24 * 3600, max_entries=20000, bypass=False):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self.lock = threading.Lock()
+        self.conn = open_database(filename)
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS engines (
+                    search_string TEXT PRIMARY KEY,
+                    engines TEXT,
+                    created_at REAL,
+                    last_used REAL
+                )
+            """)
+
+    def make_key(self, base_url, search_string):
+        return base_url.rstrip("/").lower() + " " + " ".join(search_string.split()).upper()
+
+    # Return the cached engine list, or None on a miss
+    def get(self, base_url, search_string):
+        if self.bypass:
+            return None
+
+        key = self.make_key(base_url, search_string)
+        now = time.time()
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT engines, created_at FROM engines WHERE search_string=?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                return None
+            self.conn.execute("UPDATE engines SET last_used=? WHERE search_string=?", (now, key))
+        return json.loads(row[0])
+
+    # Store an engine list and evict the least recently used entries past max_entries
+    def put(self, base_url, search_string, engines):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO engines VALUES (?, ?, ?, ?)",
+                (self.make_key(base_url, search_string), json.dumps(engines), now, now)
+            )
+            self.conn.execute("DELETE FROM engines WHERE created_at < ?", (now - self.ttl,))
+            self.conn.execute("""
+                DELETE FROM engines WHERE search_string IN (
+                    SELECT search_string FROM engines ORDER BY last_used DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+class ResponseCache:
+    """OpenAI responses keyed on a hash of the model, instructions and input.
+
+    Every generator uses temperature=0 and a prompt built only from the fitment rows,
+    so the same key always means the same answer. Values are text or raw image bytes.
+    Once the stored values pass max_bytes the least recently used ones are evicted.
+    """
+
+    def __init__(self, filename="responses.sqlite3", max_bytes=200 * 1024 * 1024, bypass=False):
+        self.max_bytes = max_bytes
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.conn = open_database(filename)
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value BLOB,
+                    size INTEGER,
+                    created_at REAL,
+                    last_used REAL
+                )
+            """)
+
+    # Content hash of everything that decides the response
+    def make_key(self, model, instructions, input, **params):
+        payload = json.dumps([model, instructions, input, params], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    # Return the cached text or bytes, or None on a miss
+    def get(self, key):
+        row = None
+        if not self.bypass:
+            with self.lock, self.conn:
+                row = self.conn.execute("SELECT value FROM responses WHERE key=?", (key,)).fetchone()
+                if row is not None:
+                    self.conn.execute("UPDATE responses SET last_used=? WHERE key=?", (time.time(), key))
+
+        with self.lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return row[0]
+
+    # Store a response and evict the least recently used ones past max_bytes
+    def put(self, key, value):
+        size = len(value.encode("utf-8")) if isinstance(value, str) else len(value)
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)", (key, value, size, now, now))
+            self.conn.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM (
+                        SELECT key, SUM(size) OVER (ORDER BY last_used DESC, key) AS kept FROM responses
+                    ) WHERE kept > ?
+                )
+            """, (self.max_bytes,))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,157 @@
+"""Compact fitment tables before they go into a prompt.
+
+One verbose string per compatibility row repeats the make, model and engine text
+over and over. compact_fitment() groups rows by make/model, merges year ranges,
+merges positions that share the same years and engine text, and pulls engine text
+that every vehicle has onto one "All vehicles" line. The result is expanded back
+into individual fitment facts and compared with the input, so a compaction that
+would lose or invent a fitment is never used.
+"""
+import json
+import os
+import re
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Tokens allowed for instructions + input of one request; larger requests aren't sent and the
+# generators use their rule-based output instead. Override with PROMPT_TOKEN_BUDGET
+PROMPT_TOKEN_BUDGET = int(os.environ.get("PROMPT_TOKEN_BUDGET", "4000"))
+
+YEAR_RANGE = re.compile(r"^(\d{4})(?:\s*-\s*(\d{4}))?$")
+
+encoders = {}
+
+# Token count with the model's tokenizer, or roughly 4 characters a token without tiktoken
+def count_tokens(text, model="gpt-4o"):
+    text = text or ""
+    if tiktoken is None:
+        return (len(text) + 3) // 4
+
+    if model not in encoders:
+        try:
+            encoders[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            encoders[model] = tiktoken.get_encoding("o200k_base")
+    return len(encoders[model].encode(text))
+
+# The original one-string-per-row JSON list the prompts used to carry
+def verbose_vehicle_list(rows):
+    return json.dumps([" ".join(row) for row in rows])
+
+# "2013-2016" -> [2013, 2014, 2015, 2016]; anything that isn't a year range stays as-is
+def expand_years(year):
+    match = YEAR_RANGE.match(year)
+    if not match:
+        return [year]
+    start = int(match.group(1))
+    end = int(match.group(2) or start)
+    return list(range(min(start, end), max(start, end) + 1))
+
+# [2010, 2012, 2013, 2014] -> "2010, 2012-2014"
+def format_years(years):
+    numbers = sorted(y for y in years if isinstance(y, int))
+    runs = []
+    for year in numbers:
+        if runs and year == runs[-1][1] + 1:
+            runs[-1][1] = year
+        else:
+            runs.append([year, year])
+    parts = [str(start) if start == end else f"{start}-{end}" for start, end in runs]
+    return ", ".join(parts + sorted(y for y in years if not isinstance(y, int)))
+
+def engine_parts(engine):
+    parts = []
+    for part in engine.split(","):
+        part = part.strip()
+        if part and part.upper() not in (p.upper() for p in parts):
+            parts.append(part)
+    return tuple(parts)
+
+# Every (year, make, model, position, engine detail set) a table of rows claims
+def fitment_facts(rows):
+    facts = set()
+    for make, model, year, position, engine in rows:
+        details = frozenset(p.upper() for p in engine_parts(engine))
+        for y in expand_years(year):
+            facts.add((str(y), make.upper(), model.upper(), position.upper(), details))
+    return facts
+
+# Group rows into {(make, model): [(years, positions, details)]} plus the details every row shares
+def group_fitment(rows):
+    parts_by_row = [engine_parts(engine) for *_, engine in rows]
+    common = []
+    if parts_by_row:
+        common = [p for p in parts_by_row[0]
+                  if all(p.upper() in (q.upper() for q in parts) for parts in parts_by_row[1:])]
+    common_upper = {p.upper() for p in common}
+
+    # Years per (make, model, position, remaining details)
+    years = {}
+    for (make, model, year, position, _), parts in zip(rows, parts_by_row):
+        details = tuple(p for p in parts if p.upper() not in common_upper)
+        key = (make.upper(), model.upper(), position, details)
+        years.setdefault(key, set()).update(expand_years(year))
+
+    # Positions sharing the same years and details go on one entry
+    entries = {}
+    for (make, model, position, details), year_set in years.items():
+        key = (make, model, format_years(year_set), details)
+        entries.setdefault(key, []).append(position)
+
+    groups = {}
+    for (make, model, year_text, details), positions in entries.items():
+        groups.setdefault((make, model), []).append((year_text, sorted(positions), details))
+    return common, groups
+
+# Facts claimed by a grouped table, for checking nothing was lost or added
+def grouped_facts(common, groups):
+    facts = set()
+    for (make, model), entries in groups.items():
+        for year_text, positions, details in entries:
+            detail_set = frozenset(p.upper() for p in tuple(common) + details)
+            for part in year_text.split(", "):
+                for y in expand_years(part):
+                    for position in positions:
+                        facts.add((str(y), make, model, position.upper(), detail_set))
+    return facts
+
+def render_groups(common, groups):
+    lines = []
+    if common:
+        lines.append("All vehicles: " + ", ".join(common))
+    for (make, model), entries in sorted(groups.items()):
+        described = []
+        for year_text, positions, details in sorted(entries):
+            described.append(" ".join(filter(None, [year_text, "/".join(p for p in positions if p), ", ".join(details)])))
+        lines.append(f"{make} {model}: " + "; ".join(described))
+    return "\n".join(lines)
+
+def compact_fitment(rows, model="gpt-4o"):
+    """Compact vehicle data for a prompt.
+
+    Returns (text, stats) where stats has the "before" and "after" token counts and
+    whether the compact form was used. Falls back to the verbose list if the compact
+    form doesn't carry exactly the same fitment facts.
+    """
+    verbose = verbose_vehicle_list(rows)
+    common, groups = group_fitment(rows)
+    compact = render_groups(common, groups)
+
+    lossless = grouped_facts(common, groups) == fitment_facts(rows)
+    text = compact if lossless else verbose
+    return text, {
+        "before": count_tokens(verbose, model),
+        "after": count_tokens(text, model),
+        "compacted": lossless,
+    }
+
+# Explains the compact format to the model
+COMPACT_FORMAT_NOTE = (
+    "Vehicle data format: one line per make and model, 'MAKE MODEL: years position details', "
+    "with entries separated by ';'. Year ranges like 2012-2016 include every year in between. "
+    "Positions joined with '/' share the same years and details. "
+    "Details on the 'All vehicles' line apply to every vehicle.\n"
+)
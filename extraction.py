@@ -0,0 +1,72 @@
+"""Bulk DOM extraction: pull a whole table or listing set out of the page in one
+execute_script call instead of a WebDriver round-trip per cell."""
+
+TABLE_JS = """
+var table = arguments[0];
+if (typeof table === 'string') {
+    table = document.evaluate(table, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+if (!table) return null;
+return Array.prototype.map.call(table.querySelectorAll('tr'), function (row) {
+    return Array.prototype.filter.call(row.children, function (cell) { return cell.tagName === 'TD'; })
+        .map(function (cell) { return cell.innerText.trim(); });
+});
+"""
+
+LISTINGS_JS = """
+var listings = document.querySelectorAll('[class*="listing-border-top-line listing-inner-content"]');
+return Array.prototype.map.call(listings, function (listing) {
+    function text(cls) {
+        var e = listing.querySelector('.' + cls);
+        return e ? e.innerText.trim() : null;
+    }
+    var info = listing.querySelector('.ra-btn-moreinfo');
+    return {
+        part_number: text('listing-final-partnumber'),
+        manufacturer: text('listing-final-manufacturer'),
+        text_row: text('listing-text-row'),
+        moreinfo_href: info ? info.href : null,
+        part_link: listing.querySelector('[id*="vew_partnumber"]')
+    };
+});
+"""
+
+PART_LISTINGS_JS = """
+return Array.prototype.map.call(document.querySelectorAll('td[class*="listing-inner-content"]'), function (listing) {
+    function text(cls) {
+        var e = listing.querySelector('.' + cls);
+        return e ? e.innerText.trim() : null;
+    }
+    return {
+        part_number: text('listing-final-partnumber'),
+        manufacturer: text('listing-final-manufacturer'),
+        notes: Array.prototype.map.call(listing.querySelectorAll('.listing-footnote-text'), function (e) {
+            return e.innerText.trim();
+        })
+    };
+});
+"""
+
+TEXTS_JS = """
+return Array.prototype.map.call(arguments[0].querySelectorAll(arguments[1]), function (e) {
+    return e.innerText.trim();
+});
+"""
+
+# Cell texts of every row in a table, given the table element or an XPath to it.
+# Rows without td cells (headers) come back as empty lists; None if the table is missing.
+def extract_table(driver, table):
+    return driver.execute_script(TABLE_JS, table)
+
+# Part number, manufacturer, text row, moreinfo link and the part number link element (None
+# when missing) of every search listing, in page order
+def extract_listings(driver):
+    return driver.execute_script(LISTINGS_JS) or []
+
+# Part number, manufacturer and footnotes of every listing on a catalog category page
+def extract_part_listings(driver):
+    return driver.execute_script(PART_LISTINGS_JS) or []
+
+# Texts of every element under root matching a CSS selector
+def extract_texts(driver, root, selector):
+    return driver.execute_script(TEXTS_JS, root, selector) or []
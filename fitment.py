@@ -0,0 +1,116 @@
+"""Vectorized cleanup of compatibility.xlsx tables.
+
+normalize_fitment() does the str()/NaN cleanup and year-range parsing once, column by
+column, so the description, title and vehicle-picker code can walk plain tuples
+instead of calling iterrows() and re-cleaning every cell.
+"""
+import os
+import threading
+import pandas as pd
+
+FITMENT_COLUMNS = ('Make', 'Model', 'Year', 'Position', 'Engine')
+
+def clean_column(column):
+    """Strings with NaN as "" and runs of whitespace collapsed"""
+    text = column.astype("string").fillna("")
+    return text.str.replace(r"\s+", " ", regex=True).str.strip().astype(object)
+
+def normalize_fitment(df):
+    """Normalized copy of a compatibility table.
+
+    Every column is trimmed text with missing values as "". Make, Model and Position keep
+    their case because titles and the vehicle pickers show them; code that groups or
+    compares rows folds the case itself. "Year Start"/"Year End" hold the parsed range as
+    nullable integers (<NA> when Year isn't a year or range). Repetitive columns are
+    categoricals. Passing an already normalized table, or a Fitment, returns its table.
+    """
+    if isinstance(df, Fitment):
+        return df.table
+    if df.attrs.get("normalized"):
+        return df
+
+    columns = {}
+    for name in FITMENT_COLUMNS:
+        columns[name] = clean_column(df[name]) if name in df.columns else pd.Series("", index=df.index, dtype=object)
+
+    # Excel hands single years back as numbers; 2012.0 -> 2012
+    columns['Year'] = columns['Year'].str.replace(r"^(\d{4})\.0$", r"\1", regex=True)
+    years = columns['Year'].str.extract(r"^(\d{4})(?:\s*-\s*(\d{4}))?$")
+    start = pd.to_numeric(years[0], errors="coerce").astype("Int64")
+    end = pd.to_numeric(years[1], errors="coerce").astype("Int64").fillna(start)
+
+    table = pd.DataFrame({
+        'Make': columns['Make'].astype("category"),
+        'Model': columns['Model'],
+        'Year': columns['Year'],
+        'Position': columns['Position'].astype("category"),
+        'Engine': columns['Engine'].astype("category"),
+        'Year Start': start.where(start <= end, end),
+        'Year End': end.where(start <= end, start),
+    }).reset_index(drop=True)
+    table.attrs["normalized"] = True
+    return table
+
+def fitment_rows(df):
+    """(make, model, year, position, engine) string tuples in table order"""
+    table = normalize_fitment(df)
+    return list(zip(*(table[name].astype(object) for name in FITMENT_COLUMNS)))
+
+def year_list(start, end, year):
+    """Every year a row covers as strings, or the raw Year text when it isn't a range"""
+    if pd.isna(start):
+        return [year] if year else []
+    return [str(y) for y in range(int(start), int(end) + 1)]
+
+class Fitment:
+    """Compatibility result for one part: the normalized fitment table and the report text.
+
+    WebScraper.get_compatibility() returns one of these; compatibility.xlsx is just an
+    export of it. Anything that takes a compatibility DataFrame takes a Fitment too.
+    """
+
+    def __init__(self, table, text="", part_number="", manufacturer="", category="", path=None):
+        self.table = normalize_fitment(table)
+        self.text = text
+        self.part_number = part_number
+        self.manufacturer = manufacturer
+        self.category = category
+        self.path = path
+
+    @classmethod
+    def from_rows(cls, rows, **kwargs):
+        """Build from (make, model, year, position, engine) rows"""
+        return cls(pd.DataFrame(list(rows), columns=list(FITMENT_COLUMNS)), **kwargs)
+
+    def __len__(self):
+        return len(self.table)
+
+    def rows(self):
+        return fitment_rows(self.table)
+
+loaded_lock = threading.Lock()
+loaded_fitments = {}  # absolute path -> ((mtime_ns, size), Fitment)
+
+def file_signature(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+def load_fitment(path):
+    """Fitment for a compatibility.xlsx on disk, parsed again only when the file changes"""
+    key = os.path.abspath(path)
+    signature = file_signature(path)
+    with loaded_lock:
+        cached = loaded_fitments.get(key)
+    if cached and cached[0] == signature:
+        return cached[1]
+
+    fitment = Fitment(pd.read_excel(path), path=path)
+    with loaded_lock:
+        loaded_fitments[key] = (signature, fitment)
+    return fitment
+
+def remember_fitment(fitment):
+    """Let load_fitment() hand back a fitment that was just exported to fitment.path"""
+    if fitment.path and os.path.exists(fitment.path):
+        with loaded_lock:
+            loaded_fitments[os.path.abspath(fitment.path)] = (file_signature(fitment.path), fitment)
@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 import threading
-import pandas as pd
+import asyncio
 import textwrap
 import json
 from openai import OpenAI
@@ -9,7 +9,12 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 from vehicleCompatibility import WebScraper
-from ai import ai_generate_short_description, ai_generate_long_description, ai_generate_image, ai_generate_title
+from httpScraper import HttpScraper
+from browser import DriverManager
+from pipeline import run_sku_pipeline, ALL_OUTPUTS
+from ai import ai_generate_short_description, ai_generate_long_description, ai_generate_image, ai_generate_title, vehicles_from_df, build_manual_title, generate_listing_content, SHORT_DESCRIPTION_MODE
+from fitment import load_fitment
+from sampling import YEAR_STRATEGIES, YEAR_STRATEGY
 
 class ProductListingGUI:
     def __init__(self, root):
@@ -21,9 +26,21 @@ class ProductListingGUI:
         self.webscraper = None
         self.product_results = []
         self.selected_category = ""
+        self.fitment = None  # compatibility of the part being listed, kept in memory
+        
+        # Chrome sessions stay warm between parts instead of relaunching each time
+        self.driver_manager = DriverManager()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         self.create_widgets()
     
+    def on_close(self):
+        """Quit the warm browser sessions before closing the window"""
+        if self.webscraper:
+            self.webscraper.close()
+        self.driver_manager.shutdown()
+        self.root.destroy()
+    
     def create_widgets(self):
         # Outer frame to center content
         outer_frame = ttk.Frame(self.root)
@@ -71,6 +88,30 @@ class ProductListingGUI:
         self.headless_var = tk.BooleanVar()
         ttk.Checkbutton(browser_frame, text="Run browser in headless mode (background)", 
                         variable=self.headless_var).grid(row=0, column=0, sticky=tk.W)
+        
+        # Number of parallel browser sessions for vehicle compatibility checks
+        ttk.Label(browser_frame, text="Browser sessions:").grid(row=1, column=0, sticky=tk.W, pady=(5, 0))
+        self.workers_var = tk.IntVar(value=min(4, os.cpu_count() or 1))
+        ttk.Spinbox(browser_frame, from_=1, to=max(1, os.cpu_count() or 1), 
+                    textvariable=self.workers_var, width=5).grid(row=1, column=1, sticky=tk.W, pady=(5, 0))
+        
+        self.http_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(browser_frame, text="Use HTTP fast path (only open Chrome for JavaScript pages)", 
+                        variable=self.http_var).grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+        
+        self.bypass_cache_var = tk.BooleanVar()
+        ttk.Checkbutton(browser_frame, text="Bypass fitment cache (re-check every engine on the site)", 
+                        variable=self.bypass_cache_var).grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+        
+        self.resource_filter_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(browser_frame, text="Block images, fonts and third-party scripts", 
+                        variable=self.resource_filter_var).grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+        
+        # Which years of each vehicle's year range get checked (see sampling.py)
+        ttk.Label(browser_frame, text="Year checks:").grid(row=5, column=0, sticky=tk.W, pady=(5, 0))
+        self.year_strategy_var = tk.StringVar(value=YEAR_STRATEGY)
+        ttk.Combobox(browser_frame, textvariable=self.year_strategy_var, values=list(YEAR_STRATEGIES),
+                     state="readonly", width=8).grid(row=5, column=1, sticky=tk.W, pady=(5, 0))
 
         # Storefront selection
         ttk.Label(main_frame, text="Storefront:").grid(row=2, column=0, sticky=tk.W, pady=5)
@@ -130,10 +171,15 @@ class ProductListingGUI:
                                    state="readonly", width=60)
         category_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), pady=5)
 
+        # Start AI generation as soon as compatibility finishes
+        self.auto_generate_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(self.product_frame, text="Generate title, descriptions and image when compatibility finishes", 
+                        variable=self.auto_generate_var).grid(row=3, column=0, columnspan=2, sticky=tk.W, pady=5)
+
         # Process selections button
         self.process_btn = ttk.Button(self.product_frame, text="Process Selections", 
                                       command=self.process_selections)
-        self.process_btn.grid(row=3, column=0, columnspan=2, pady=10)
+        self.process_btn.grid(row=4, column=0, columnspan=2, pady=10)
 
         # Results frame
         results_frame = ttk.LabelFrame(main_frame, text="Results", padding="10")
@@ -218,9 +264,13 @@ class ProductListingGUI:
         self.short_desc_text = scrolledtext.ScrolledText(ai_frame, width=80, height=6, wrap=tk.WORD)
         self.short_desc_text.grid(row=3, column=1, pady=5, sticky="ew")
 
-        # Generate short desc button
-        gen_short_btn = ttk.Button(ai_frame, text="Generate Short Desc", command=self.generate_short_desc)
-        gen_short_btn.grid(row=4, column=0, columnspan=2, pady=5)
+        # Generate short desc button, rule-based unless AI is ticked
+        short_btn_frame = ttk.Frame(ai_frame)
+        short_btn_frame.grid(row=4, column=0, columnspan=2, pady=5)
+        gen_short_btn = ttk.Button(short_btn_frame, text="Generate Short Desc", command=self.generate_short_desc)
+        gen_short_btn.pack(side=tk.LEFT)
+        self.short_desc_ai_var = tk.BooleanVar(value=SHORT_DESCRIPTION_MODE == "llm")
+        ttk.Checkbutton(short_btn_frame, text="Use AI", variable=self.short_desc_ai_var).pack(side=tk.LEFT, padx=(10, 0))
 
         # AI generated long desc text field
         ttk.Label(ai_frame, text="Long Description:").grid(row=5, column=0, sticky=(tk.W, tk.N), pady=5)
@@ -243,6 +293,10 @@ class ProductListingGUI:
         gen_img_btn = ttk.Button(ai_frame, text="Generate Vehicle Image", command=self.generate_vehicle_image)
         gen_img_btn.grid(row=8, column=0, columnspan=2, pady=5)
 
+        # Generate everything at once
+        gen_all_btn = ttk.Button(ai_frame, text="Generate All", command=self.generate_all)
+        gen_all_btn.grid(row=9, column=0, columnspan=2, pady=(15, 5))
+
 
 
     def start_webscraper(self):
@@ -251,6 +305,9 @@ class ProductListingGUI:
             messagebox.showerror("Error", "Please enter a part number")
             return
         
+        # A new part's compatibility replaces the last one
+        self.fitment = None
+        
         # Disable the button and show progress
         self.get_data_btn.config(state='disabled')
         self.progress.start()
@@ -264,11 +321,22 @@ class ProductListingGUI:
     def run_webscraper(self):
         """Run the webscraper and handle results"""
         try:
+            # Give back the previous part's browsers so they can be reused
+            if self.webscraper:
+                self.webscraper.close()
+            
             # Initialize webscraper
-            self.webscraper = WebScraper(
+            scraper_class = HttpScraper if self.http_var.get() else WebScraper
+            self.webscraper = scraper_class(
                 storefront=self.storefront_var.get(),
                 headless=self.headless_var.get(),
-                status_callback=self.update_status
+                status_callback=self.update_status,
+                workers=self.workers_var.get(),
+                bypass_cache=self.bypass_cache_var.get(),
+                driver_manager=self.driver_manager,
+                resource_filter=self.resource_filter_var.get(),
+                year_strategy=self.year_strategy_var.get(),
+                priority="interactive"
             )
             
             # Search for products
@@ -351,26 +419,35 @@ class ProductListingGUI:
             return
         
         # Disable controls and show progress
+        self.fitment = None
         self.process_btn.config(state='disabled')
         self.progress.start()
         self.status_var.set("Processing selections...")
         
+        # Read Tk state here; the pipeline runs off the main thread
+        pipeline_options = dict(
+            specs_index=specs_index,
+            part_number=self.product_results[compat_index]['part_number'],
+            category=self.product_results[compat_index]['category'],
+            alternate_numbers=self.get_alternate_numbers(),
+            outputs=ALL_OUTPUTS if self.auto_generate_var.get() else (),
+            short_description_mode=self.short_description_mode()
+        )
+        
         # Start processing in separate thread
-        thread = threading.Thread(target=self.run_processing, args=(specs_index, compat_index))
+        thread = threading.Thread(target=self.run_processing, args=(compat_index, pipeline_options))
         thread.daemon = True
         thread.start()
 
-    def run_processing(self, specs_index, compat_index):
-        """Run the processing in background thread"""
+    def run_processing(self, compat_index, pipeline_options):
+        """Run the SKU pipeline in background thread"""
         try:
-            # Process specifications if requested
-            if specs_index is not None:
-                self.update_status("Getting specifications...")
-                self.webscraper.get_specifications(specs_index)
-            
-            # Process compatibility
-            self.update_status("Getting compatibility information...")
-            results = self.webscraper.get_compatibility(compat_index)
+            self.update_status("Getting specifications and compatibility information...")
+            results = asyncio.run(run_sku_pipeline(
+                self.webscraper, compat_index,
+                on_result=lambda name, value: self.root.after(0, self.handle_stage_result, name, value),
+                **pipeline_options
+            ))
             
             # Update GUI with results
             self.root.after(0, lambda: self.handle_processing_results(results))
@@ -378,29 +455,57 @@ class ProductListingGUI:
         except Exception as e:
             self.root.after(0, lambda: self.handle_error(str(e)))
 
-    def handle_processing_results(self, results):
-        """Handle the processing results"""
-        self.progress.stop()
-        self.process_btn.config(state='normal')
-        self.status_var.set("Processing completed")
+    def handle_stage_result(self, name, value):
+        """Show each pipeline stage's result as soon as it finishes"""
+        if isinstance(value, Exception):
+            messagebox.showerror("Error", f"Could not generate {name.replace('_', ' ')}: {value}")
         
-        # Display results
-        self.results_text.delete(1.0, tk.END)
-        self.results_text.insert(tk.END, results)
+        elif name == "compatibility":
+            # Keep the fitment in memory for the generate buttons
+            self.fitment = value
+            
+            # Display results
+            self.results_text.delete(1.0, tk.END)
+            self.results_text.insert(tk.END, value.text)
+            self.status_var.set("Compatibility done, generating listing content...")
         
-        # Refresh vehicle dropdown values for both combo boxes
-        vehicle_list = self.get_vehicles()
-        if vehicle_list:
+        elif name == "vehicles" and value:
             # Populate both vehicle selection combo boxes with readable display strings
-            title_options = [v['title_display'] for v in vehicle_list]
-            image_options = [v['simple_display'] for v in vehicle_list]
-
-            self.vehicle_combo_title['values'] = title_options
+            self.vehicle_combo_title['values'] = [v['title_display'] for v in value]
             self.vehicle_combo_title.set("")
 
-            self.vehicle_combo_image['values'] = image_options
+            self.vehicle_combo_image['values'] = [v['simple_display'] for v in value]
             self.vehicle_combo_image.set("")
         
+        elif name == "title" and value:
+            self.listing_title.delete("1.0", tk.END)
+            self.listing_title.insert(tk.END, value)
+        
+        elif name == "short_description" and value:
+            self.short_desc_text.delete("1.0", tk.END)
+            self.short_desc_text.insert(tk.END, value)
+        
+        elif name == "long_description" and value:
+            self.long_desc_text.delete("1.0", tk.END)
+            self.long_desc_text.insert(tk.END, value)
+        
+        elif name == "image":
+            if value: messagebox.showinfo("Success", f"Image generation results saved to {value}")
+            else: messagebox.showerror("Error", "Image generation was unsuccessful.")
+
+    def handle_processing_results(self, results):
+        """Handle the processing results"""
+        self.progress.stop()
+        self.process_btn.config(state='normal')
+        self.status_var.set("Processing completed")
+        
+        # Per-stage wall-clock times; the SKU took about as long as the slowest one
+        timings = results.get("timings", {})
+        if timings:
+            self.results_text.insert(tk.END, "\nPipeline stage times\n")
+            for name, seconds in timings.items():
+                self.results_text.insert(tk.END, f"  {name}: {seconds:.1f}s\n")
+        
         # Close webscraper
         if self.webscraper:
             self.webscraper.close()      
@@ -463,13 +568,17 @@ class ProductListingGUI:
     
     def generate_title(self):
         """Generate a product title in format: Position Category | Make Model Years"""
+        generators = self.title_generator()
+        self.run_generation(generators)
+
+    def title_generator(self):
+        """Title generator for the background thread, falling back to the manual title"""
         category = self.category_var.get().strip()
         selected_vehicle = self.vehicle_var_title.get().strip()
         
         # Find the selected vehicle data
         vehicle_list = self.get_vehicles()
         selected_vehicle_data = None
-        manual_title = ""
         
         for vehicle in vehicle_list:
             if vehicle['title_display'] == selected_vehicle:
@@ -477,136 +586,106 @@ class ProductListingGUI:
                 break
         
         # Generate title: Position Category | Make Model Years (extra info)
-        if selected_vehicle_data:
-            title_parts = []
-            if selected_vehicle_data['position']:
-                title_parts.append(selected_vehicle_data['position'])
-            if category:
-                title_parts.append(category)
-            first_part = " ".join(title_parts)
-            second_part = f"{selected_vehicle_data['make']} {selected_vehicle_data['model']} {selected_vehicle_data['years']}"
-            if selected_vehicle_data['extra_info']:
-                second_part = second_part + "(" + selected_vehicle_data['extra_info'] + ")"
-            manual_title = f"{first_part} | {second_part}"
-        
-        ai_title = ai_generate_title(category, selected_vehicle, vehicle_list)
-
-        # Clear and set the title
-        self.listing_title.delete("1.0", tk.END)
-        if ai_title: self.listing_title.insert(tk.END, ai_title)
-        else: self.listing_title.insert(tk.END, manual_title)
+        manual_title = build_manual_title(category, selected_vehicle_data)
+        
+        def generate():
+            return ai_generate_title(category, selected_vehicle, vehicle_list) or manual_title
+        return {"title": (generate,)}
 
-    def generate_short_desc(self):
-        """Generate short description using AI"""
+    def current_fitment(self, show_errors=True):
+        """Fitment from the last compatibility run, else compatibility.xlsx (only re-read when it changes)"""
+        if self.fitment is not None:
+            return self.fitment
+        
         if not self.webscraper or not hasattr(self.webscraper, 'compatibility_excel_path'):
-            messagebox.showerror("Error", "No compatibility data available. Please run the webscraper first.")
-            return
+            if show_errors: messagebox.showerror("Error", "No compatibility data available. Please run the webscraper first.")
+            return None
         
         excel_path = self.webscraper.compatibility_excel_path
         if not os.path.exists(excel_path):
-            messagebox.showerror("Error", "compatibility.xlsx not found.")
-            return
+            if show_errors: messagebox.showerror("Error", "compatibility.xlsx not found.")
+            return None
         
         try:
-            df = pd.read_excel(excel_path)
-            desc = ai_generate_short_description(df, self.category_var.get().strip())
-            self.short_desc_text.delete("1.0", tk.END)
-            self.short_desc_text.insert(tk.END, desc)
+            return load_fitment(excel_path)
         except Exception as e:
-            messagebox.showerror("Error", f"Could not generate short description: {e}")
+            if show_errors: messagebox.showerror("Error", f"Could not read Excel: {e}")
+            return None
+
+    def generate_short_desc(self):
+        """Generate short description using AI"""
+        fitment = self.current_fitment()
+        if fitment:
+            category = self.category_var.get().strip()
+            mode = self.short_description_mode()
+            self.run_generation({"short_description": (ai_generate_short_description, fitment, category, mode)})
+
+    def short_description_mode(self):
+        """Short description mode chosen in the GUI: offline (rule-based) or llm"""
+        return "llm" if self.short_desc_ai_var.get() else "offline"
 
     def generate_long_desc(self):
         """Generate long description using AI"""
-        if not self.webscraper or not hasattr(self.webscraper, 'compatibility_excel_path'):
-            messagebox.showerror("Error", "No compatibility data available. Please run the webscraper first.")
+        fitment = self.current_fitment()
+        if fitment:
+            category = self.category_var.get().strip()
+            part_number = self.part_number_var.get().strip()
+            alternate_numbers = self.get_alternate_numbers()
+            self.run_generation({"long_description": (
+                ai_generate_long_description, fitment, part_number, alternate_numbers, category
+            )})
+
+    def generate_all(self):
+        """Generate title, both descriptions and the image at the same time"""
+        fitment = self.current_fitment()
+        if not fitment:
             return
         
-        excel_path = self.webscraper.compatibility_excel_path
-        if not os.path.exists(excel_path):
-            messagebox.showerror("Error", "compatibility.xlsx not found.")
-            return
-        
-        try:
-            df = pd.read_excel(excel_path)
-            desc = ai_generate_long_description(df, self.part_number_var.get().strip(), self.get_alternate_numbers())
-            self.long_desc_text.delete("1.0", tk.END)
-            self.long_desc_text.insert(tk.END, desc)
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not generate long description: {e}")
+        category = self.category_var.get().strip()
+        part_number = self.part_number_var.get().strip()
+        alternate_numbers = self.get_alternate_numbers()
+        
+        generators = self.title_generator()
+        mode = self.short_description_mode()
+        generators["short_description"] = (ai_generate_short_description, fitment, category, mode)
+        generators["long_description"] = (
+            ai_generate_long_description, fitment, part_number, alternate_numbers, category
+        )
+        generators.update(self.image_generator())
+        self.run_generation(generators)
 
-    def get_vehicles(self):
-        if not self.webscraper or not hasattr(self.webscraper, 'compatibility_excel_path'):
-            return []
+    def run_generation(self, generators):
+        """Run AI generators concurrently off the Tk thread, showing each result as it lands"""
+        self.status_var.set(f"Generating {', '.join(n.replace('_', ' ') for n in generators)}...")
+        latencies = {}
         
-        excel_path = self.webscraper.compatibility_excel_path
-        if not os.path.exists(excel_path):
-            return []
+        def output_done(name, value, seconds):
+            latencies[name] = seconds
+            self.root.after(0, self.handle_stage_result, name, value)
+            summary = ", ".join(f"{n.replace('_', ' ')} {s:.1f}s" for n, s in latencies.items())
+            self.update_status(f"Generated: {summary}")
         
-        # read excel sheet
-        try:
-            df = pd.read_excel(excel_path)
-        except Exception as e:
-            messagebox.showerror("Error", f"Could not read Excel: {e}")
+        thread = threading.Thread(target=generate_listing_content, args=(generators, output_done))
+        thread.daemon = True
+        thread.start()
+
+    def get_vehicles(self):
+        fitment = self.current_fitment(show_errors=False)
+        if fitment is None:
             return []
         
         # turn vehicles list into array with structured data
-        vehicles = []
-        for _, row in df.iterrows():
-            year_range = row['Year']
-            
-            # Check if year_range is valid (not NaN or None)
-            if pd.isna(year_range) or year_range is None:
-                continue
-            
-            # Convert to string if it's not already
-            year_range = str(year_range)
-            
-            # Get Make and Model
-            make = row.get('Make', '')
-            model = row.get('Model', '')
-            
-            if pd.isna(make) or pd.isna(model):
-                continue
-            
-            make = str(make)
-            model = str(model)
-            
-            # Get Position and extra info
-            position = ""
-            if 'Position' in row and not pd.isna(row['Position']):
-                position = str(row['Position'])
-            extra_info = ""
-            if 'Engine' in row and not pd.isna(row['Engine']):
-                extra_info = str(row['Engine'])
-            
-            # Create display strings for different purposes
-            simple_display = f"{make} {model} {year_range}"  # For image generation
-            title_display = simple_display
-            if position:
-                title_display += f" {position}"  # For title generation
-            if extra_info:
-                title_display += f" {extra_info}"  # For title generation
-            
-            vehicles.append({
-                'simple_display': simple_display,  # For image combo
-                'title_display': title_display,    # For title combo
-                'make': make,
-                'model': model,
-                'years': year_range,
-                'position': position,
-                'extra_info': extra_info
-            })
-        # print(vehicles)
-        return vehicles
+        return vehicles_from_df(fitment)
     
     def generate_vehicle_image(self):
-        """Generate vehicle image - placeholder for now"""
+        """Generate vehicle image"""
+        self.run_generation(self.image_generator())
+
+    def image_generator(self):
+        """Image generator for the background thread"""
         selected_vehicle = self.vehicle_var.get().strip()
-        vehicle_list = self.vehicle_combo_image['values']
-        
-        image_path = ai_generate_image(selected_vehicle, vehicle_list)
-        if image_path: messagebox.showinfo("Success", f"Image generation results saved to {image_path}")
-        else: messagebox.showerror("Error", "Image generation was unsuccessful.")
+        vehicle_list = list(self.vehicle_combo_image['values'])
+        return {"image": (ai_generate_image, selected_vehicle, vehicle_list)}
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -0,0 +1,224 @@
+import re
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from vehicleCompatibility import WebScraper, match_listing
+from specifications import createSpecificationsExcel, writeSpecificationsExcel
+
+# Create a requests session with a connection pool sized for the scraper workers
+def create_session(pool_size=10):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                      "(KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+        "Accept-Language": "en-US,en;q=0.9",
+    })
+    return session
+
+# The site answering 429/503: we're being rate limited
+class Throttled(requests.HTTPError):
+    pass
+
+THROTTLE_STATUSES = {429, 503}
+
+# Collapse whitespace the way the browser's rendered .text does
+def element_text(element):
+    return " ".join(element.get_text(" ").split()) if element else ""
+
+class HttpScraper(WebScraper):
+    """WebScraper backend that reads server-rendered pages over pooled HTTP sessions.
+
+    The partsearch listing, catalog category pages and moreinfo spec tables are parsed
+    straight from HTML. Chrome is only started when a page needs JavaScript (the
+    buyer's-guide popup and the catalog autosuggest) or when the HTML is missing the
+    markup we expect. Point base_url at a local server to run it against saved pages.
+    """
+
+    def __init__(self, *args, session=None, **kwargs):
+        self.owns_session = session is None
+        self.session = session or create_session(pool_size=max(10, 2 * int(kwargs.get('workers', 1))))
+        super().__init__(*args, **kwargs)
+
+    # The browser is started on demand by require_driver
+    def init_driver(self):
+        pass
+
+    # Start the browser the first time a page needs JavaScript
+    def require_driver(self):
+        if self.driver is None:
+            WebScraper.init_driver(self)
+        return self.driver
+
+    # Workers share this scraper's connection pool
+    def worker_options(self):
+        return dict(super().worker_options(), session=self.session)
+
+    # Fetch a page and parse it, paced by the rate limiter. Throttling and connection errors
+    # count against the circuit breaker and are retried with the scraper's backoff policy
+    def fetch(self, url, page_type="catalog"):
+        def get():
+            self.breaker.wait()
+            self.rate_limiter.acquire(page_type, self.priority, self.update_status)
+            try:
+                response = self.session.get(url, timeout=15)
+            except (requests.ConnectionError, requests.Timeout):
+                self.breaker.failure()
+                raise
+
+            if response.status_code in THROTTLE_STATUSES:
+                self.breaker.failure()
+                raise Throttled(f"{response.status_code} for {url}", response=response)
+            self.breaker.success()
+            response.raise_for_status()
+            return response
+
+        response = self.retry.call(get, retry_on=(Throttled, requests.ConnectionError, requests.Timeout))
+        return BeautifulSoup(response.text, "html.parser")
+
+    # Search for products by SKU from the server-rendered listing page
+    def search_products(self, sku):
+        self.update_status(f"Searching for SKU: {sku}")
+
+        website = f"{self.base_url}/en/partsearch/?partnum={sku}"
+        try:
+            soup = self.fetch(website, "search")
+        except requests.RequestException:
+            soup = None
+
+        if soup is None or soup.find(class_="listings-container") is None:
+            self.update_status("Listing page needs a browser, starting Chrome...")
+            self.require_driver()
+            return super().search_products(sku)
+
+        all_results = soup.select('[class*="listing-border-top-line listing-inner-content"]')
+        if not all_results:
+            raise Exception(f"No results found for SKU: {sku}")
+
+        self.product_results = []
+        for result in all_results:
+            part_number = result.find(class_="listing-final-partnumber")
+            manufacturer = result.find(class_="listing-final-manufacturer")
+            text_row = result.find(class_="listing-text-row")
+            if not (part_number and manufacturer and text_row):
+                continue
+
+            moreinfo = result.find(class_="ra-btn-moreinfo")
+            self.product_results.append(
+                dict(part_number = element_text(part_number),
+                     manufacturer = element_text(manufacturer),
+                     category = re.split(r"\s[\(\[].*$", element_text(text_row)[10:])[0].strip(),
+                     moreinfo_href = urljoin(website, moreinfo["href"]) if moreinfo and moreinfo.get("href") else None,
+                )
+            )
+
+        return self.product_results
+
+    # Get specifications from the moreinfo page's spec table
+    def get_specifications(self, product_index):
+        if product_index >= len(self.product_results):
+            raise Exception("Invalid product index for specifications")
+
+        self.update_status("Getting product specifications...")
+
+        try:
+            href = self.product_results[product_index]['moreinfo_href']
+            if not href:
+                writeSpecificationsExcel(None, self.specifications_excel_path)
+                return
+
+            table = self.fetch(href, "moreinfo").find(class_="moreinfotable")
+            if table is None:
+                createSpecificationsExcel(href, self.require_driver(), self.specifications_excel_path)
+                return
+
+            rows = []
+            for row in table.find_all("tr"):
+                cells = row.find_all("td")
+                if len(cells) < 2:
+                    continue
+                rows.append((element_text(cells[0]), element_text(cells[1])))
+            writeSpecificationsExcel(rows, self.specifications_excel_path)
+
+        except Exception as e:
+            # If specifications fail, continue with compatibility
+            self.update_status(f"Specifications failed: {str(e)}")
+
+    # The buyer's-guide popup is built by JavaScript, so it always needs the browser
+    def read_buyers_guide(self, product_index):
+        self.require_driver()
+        return super().read_buyers_guide(product_index)
+
+    # The catalog autosuggest is built by JavaScript, so it always needs the browser
+    def search_catalog(self, search_string):
+        self.require_driver()
+        return super().search_catalog(search_string)
+
+    # Engine displacement and category listings over HTTP by following the catalog tree links.
+    # Returns None when the tree isn't in the HTML and the browser has to click through it,
+    # and (engine_displacement, None) when the category page couldn't be fetched.
+    def fetch_engine_listings(self, engine, category):
+        if not engine.get('url'):
+            return None
+
+        try:
+            engine_page = self.fetch(engine['url'])
+            crumb = engine_page.select_one("div[id^='breadcrumb_location_banner_inner'] span.belem.active")
+            engine_displacement = element_text(crumb) or engine['text']
+
+            hub_link = self.find_link(engine_page, "Brake & Wheel Hub", exact=False)
+            category_link = hub_link and self.find_link(self.fetch(urljoin(engine['url'], hub_link)), category)
+        except requests.RequestException:
+            category_link = None
+
+        if not category_link:
+            return None
+
+        try:
+            category_page = self.fetch(urljoin(engine['url'], category_link))
+        except requests.RequestException:
+            return engine_displacement, None
+
+        return engine_displacement, [{
+            'part_number': element_text(listing.find(class_="listing-final-partnumber")),
+            'manufacturer': element_text(listing.find(class_="listing-final-manufacturer")),
+            'notes': [element_text(e) for e in listing.find_all(class_="listing-footnote-text")],
+        } for listing in category_page.select("td[class*='listing-inner-content']")]
+
+    # Check one engine over HTTP, matching the part the same way as the browser's filter box
+    def process_engine_compatibility(self, search_string, engine, part_number, manufacturer, category):
+        result = self.fetch_engine_listings(engine, category)
+        if result is None:
+            self.require_driver()
+            return super().process_engine_compatibility(search_string, engine, part_number, manufacturer, category)
+
+        engine_displacement, listings = result
+        if listings is None:
+            return engine_displacement, None, False
+
+        part_info, part_fits = match_listing(listings, part_number, manufacturer)
+        return engine_displacement, part_info, part_fits
+
+    # Every listing on an engine's category page, over HTTP when the catalog tree allows
+    def read_engine_listings(self, search_string, engine, category):
+        result = self.fetch_engine_listings(engine, category)
+        if result is None:
+            self.require_driver()
+            return super().read_engine_listings(search_string, engine, category)
+        return result
+
+    # Find a catalog link by its text and return its href
+    def find_link(self, soup, text, exact=True):
+        for link in soup.find_all("a", href=True):
+            link_text = element_text(link)
+            if (link_text == text) if exact else (text in link_text):
+                return link["href"]
+        return None
+
+    def close(self):
+        super().close()
+        if self.owns_session:
+            self.session.close()
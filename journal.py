@@ -0,0 +1,94 @@
+import os
+import json
+import threading
+
+class ProgressJournal:
+    """Append-only JSONL record of one part's finished compatibility work.
+
+    Every finished vehicle year check and every engine result checked on the site is
+    appended and flushed to disk as it completes, so a run that dies part way (a
+    crashed browser, a killed process) can be restarted without redoing that work:
+    WebScraper.get_compatibility() answers finished checks from the journal and
+    writes compatibility.xlsx and extraInfo.txt from the journal plus the new checks.
+    The first line names the part; a journal for a different part is started over.
+    """
+
+    def __init__(self, path, part_number, manufacturer, category):
+        self.path = path
+        self.header = {'type': 'part', 'part_number': part_number, 'manufacturer': manufacturer, 'category': category}
+        self.lock = threading.Lock()
+        self.vehicles = {}
+        self.engines = {}
+
+        records, intact = self.read()
+        if records and records[0] == self.header:
+            for record in records[1:]:
+                if record.get('type') == 'vehicle':
+                    self.vehicles[self.vehicle_key(record['info'])] = record['info']
+                elif record.get('type') == 'engine':
+                    self.engines[tuple(record['key'])] = tuple(record['result'])
+
+            # Drop a line torn by a crash so new records don't get glued onto it
+            with open(path, "r+b") as f:
+                f.truncate(intact)
+            self.file = open(path, "a", encoding="utf-8")
+        else:
+            self.file = open(path, "w", encoding="utf-8")
+            self.append(self.header)
+
+    # Every intact record and the byte offset where they end; a line cut short by a
+    # crash ends the journal
+    def read(self):
+        if not os.path.exists(self.path):
+            return [], 0
+
+        records = []
+        intact = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                intact += len(line)
+        return records, intact
+
+    def append(self, record):
+        with self.lock:
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    # A vehicle check is one buyer's guide row narrowed to the years it searched
+    def vehicle_key(self, vehicle):
+        return tuple(str(vehicle[k]) for k in ('make', 'model', 'start_year', 'end_year'))
+
+    # Finished vehicle_info for a vehicle check, or None
+    def vehicle(self, vehicle):
+        return self.vehicles.get(self.vehicle_key(vehicle))
+
+    def record_vehicle(self, vehicle_info):
+        self.vehicles[self.vehicle_key(vehicle_info)] = vehicle_info
+        self.append({'type': 'vehicle', 'info': vehicle_info})
+
+    # Engine result for a fitment cache key, or None
+    def engine(self, key):
+        return self.engines.get(tuple(key))
+
+    def record_engine(self, key, result):
+        self.engines[tuple(key)] = tuple(result)
+        self.append({'type': 'engine', 'key': list(key), 'result': list(result)})
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+    # Close and delete the journal once the part's results are complete
+    def finish(self):
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
@@ -0,0 +1,133 @@
+"""Per-SKU asyncio pipeline.
+
+Specifications are scraped on a second scraper while compatibility runs, and the
+title, short/long descriptions and image generations all start together as soon as
+compatibility.xlsx exists. A SKU then takes about as long as its slowest stage
+instead of the sum of all of them.
+"""
+import asyncio
+import os
+import time
+from ai import (ai_generate_title, ai_generate_short_description, ai_generate_long_description,
+                ai_generate_image, vehicles_from_df, build_manual_title, generate_listing_content,
+                fitment_fingerprint)
+
+ALL_OUTPUTS = ("title", "short_description", "long_description", "image")
+
+# Outputs that depend only on the category, fitment table and selected vehicle, not the part number
+SHARED_OUTPUTS = ("title", "short_description")
+
+# Pick the vehicle whose display string starts with the wanted text, if any
+def select_vehicle(vehicles, wanted):
+    wanted = (wanted or "").strip().upper()
+    if not wanted:
+        return None
+    return next((v for v in vehicles
+                 if v['simple_display'].upper().startswith(wanted) or v['title_display'].upper() == wanted), None)
+
+# Scrape specifications on a separate scraper so it doesn't queue behind compatibility. The
+# scraper is kept for later SKUs; one whose browser died is replaced for the next SKU
+def scrape_specifications(scraper, specs_index):
+    worker = scraper.get_specs_worker()
+    try:
+        worker.product_results = scraper.product_results
+        worker.set_results_folder(scraper.results_folder)
+        worker.get_specifications(specs_index)
+    finally:
+        worker.recover_driver()
+
+async def run_sku_pipeline(scraper, compat_index, specs_index=None, part_number="", category="",
+                           alternate_numbers=(), selected_vehicle="", outputs=ALL_OUTPUTS, on_result=None,
+                           shared=None, short_description_mode=None):
+    """Run specifications, compatibility and AI generation for one SKU.
+
+    on_result(name, value) is called from worker threads as each stage finishes:
+    "specifications", "compatibility", "vehicles", then each requested output.
+    Returns a dict of every stage's result plus per-stage "timings" in seconds.
+
+    shared is an optional dict kept across SKUs: titles and short descriptions are
+    stored there by fitment fingerprint and reused by later SKUs with the same table
+    instead of being generated again. Their names are listed in results["reused"].
+    """
+    results = {}
+    timings = {}
+
+    async def stage(name, func, *args):
+        start = time.perf_counter()
+        try:
+            value = await asyncio.to_thread(func, *args)
+        finally:
+            timings[name] = time.perf_counter() - start
+        results[name] = value
+        if on_result:
+            on_result(name, value)
+        return value
+
+    specs_task = None
+    if specs_index is not None:
+        specs_task = asyncio.create_task(stage("specifications", scrape_specifications, scraper, specs_index))
+
+    try:
+        # A Fitment; its normalized table is shared by every generator below
+        fitment = await stage("compatibility", scraper.get_compatibility, compat_index)
+        df = fitment.table
+        vehicles = vehicles_from_df(df)
+        results["vehicles"] = vehicles
+        results["fingerprint"] = fitment_fingerprint(df)
+        results["reused"] = []
+        if on_result:
+            on_result("vehicles", vehicles)
+
+        product = scraper.selected_product or {}
+        part_number = part_number or product.get('part_number', "")
+        category = category or product.get('category', "")
+        selected = select_vehicle(vehicles, selected_vehicle)
+
+        def generate_title():
+            title = ai_generate_title(category, selected['title_display'] if selected else "", vehicles)
+            return title or build_manual_title(category, selected or (vehicles[0] if vehicles else None))
+
+        generators = {
+            "title": (generate_title,),
+            "short_description": (ai_generate_short_description, df, category, short_description_mode),
+            "long_description": (ai_generate_long_description, df, part_number, list(alternate_numbers), category),
+            "image": (ai_generate_image, selected['simple_display'] if selected else "",
+                      [v['simple_display'] for v in vehicles],
+                      os.path.join(scraper.results_folder, "vehicle_image.jpg")),
+        }
+
+        def shared_key(name):
+            variant = selected_vehicle.upper() if name == "title" else short_description_mode
+            return (name, results["fingerprint"], category.upper(), variant)
+
+        # Reuse anything a SKU with the same fitment table already generated
+        wanted = {}
+        for name in outputs:
+            if name not in generators:
+                continue
+            if shared is not None and name in SHARED_OUTPUTS and shared_key(name) in shared:
+                results[name] = shared[shared_key(name)]
+                timings[name] = 0.0
+                results["reused"].append(name)
+                if on_result:
+                    on_result(name, results[name])
+            else:
+                wanted[name] = generators[name]
+
+        # Everything else at once on the shared OpenAI client
+        def output_done(name, value, seconds):
+            results[name] = value
+            timings[name] = seconds
+            if shared is not None and name in SHARED_OUTPUTS and value and not isinstance(value, Exception):
+                shared[shared_key(name)] = value
+            if on_result:
+                on_result(name, value)
+
+        await asyncio.to_thread(generate_listing_content, wanted, output_done)
+    finally:
+        # Specifications failures are reported by the scraper and never stop the SKU
+        if specs_task:
+            await asyncio.gather(specs_task, return_exceptions=True)
+
+    results["timings"] = timings
+    return results
@@ -0,0 +1,206 @@
+import os
+import time
+import threading
+from collections import defaultdict
+from cache import open_database
+
+# Requests per second and burst size per page type, override with
+# RATE_LIMITS="search=0.5:3,catalog=2:6,moreinfo=0.5:2"
+PAGE_BUDGETS = {
+    "search": (0.5, 3),
+    "catalog": (2.0, 6),
+    "moreinfo": (0.5, 2),
+}
+
+PRIORITIES = ("interactive", "batch")
+
+# Waiters that haven't checked in for this long belong to a process that died
+WAITER_TTL = 10.0
+
+def parse_budgets(text):
+    budgets = dict(PAGE_BUDGETS)
+    for item in filter(None, (part.strip() for part in (text or "").split(","))):
+        page_type, _, budget = item.partition("=")
+        rate, _, burst = budget.partition(":")
+        budgets[page_type.strip()] = (float(rate), float(burst or 1))
+    return budgets
+
+class RateLimiter:
+    """Token buckets per page type, shared by every scraper in every process through SQLite.
+
+    acquire() blocks until the page type's bucket has a token. Buckets refill at their
+    rate up to their burst size. Batch requests leave the last reserve fraction of a
+    bucket to interactive (GUI) requests and also wait while any interactive request
+    is queued, so a person clicking in the GUI isn't stuck behind a batch run. Waiters
+    are registered in the database, which is what the queue depth metric counts.
+    """
+
+    def __init__(self, filename="ratelimit.sqlite3", budgets=None, reserve=0.34):
+        self.budgets = budgets or parse_budgets(os.environ.get("RATE_LIMITS"))
+        self.reserve = reserve
+        self.lock = threading.Lock()
+        self.conn = open_database(filename)
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS buckets (
+                    page_type TEXT PRIMARY KEY,
+                    tokens REAL,
+                    updated REAL
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS waiters (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    page_type TEXT,
+                    priority TEXT,
+                    seen REAL
+                )
+            """)
+
+        # [requests, total wait, max wait] per (page_type, priority) for this process
+        self.waits = defaultdict(lambda: [0, 0.0, 0.0])
+        self.max_depth = defaultdict(int)
+
+    # Take a token if the bucket has one to spare at this priority, else seconds until it will
+    def try_take(self, page_type, priority, waiter_id):
+        rate, burst = self.budgets[page_type]
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.execute("UPDATE waiters SET seen=? WHERE id=?", (now, waiter_id))
+                row = self.conn.execute(
+                    "SELECT tokens, updated FROM buckets WHERE page_type=?", (page_type,)
+                ).fetchone()
+                tokens = burst if row is None else min(burst, row[0] + max(0.0, now - row[1]) * rate)
+
+                floor = 0.0
+                if priority != "interactive":
+                    floor = min(self.reserve * burst, burst - 1)
+                    interactive = self.conn.execute(
+                        "SELECT COUNT(*) FROM waiters WHERE page_type=? AND priority='interactive' AND seen>?",
+                        (page_type, now - WAITER_TTL)
+                    ).fetchone()[0]
+                    if interactive:
+                        floor = burst
+
+                taken = tokens - 1 >= floor - 1e-9
+                if taken:
+                    tokens -= 1
+                self.conn.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)", (page_type, tokens, now))
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+
+        if taken:
+            return 0.0
+        return max(0.05, (min(floor, burst - 1) + 1 - tokens) / rate)
+
+    def enqueue(self, page_type, priority):
+        with self.lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO waiters (page_type, priority, seen) VALUES (?, ?, ?)", (page_type, priority, time.time())
+            )
+            return cursor.lastrowid
+
+    def dequeue(self, waiter_id):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM waiters WHERE id=?", (waiter_id,))
+
+    def acquire(self, page_type, priority="batch", status=None):
+        """Block until a page of this type may be loaded; returns the seconds waited.
+
+        Page types without a budget aren't limited. status is told once when the wait
+        is going to be noticeable.
+        """
+        if page_type not in self.budgets:
+            return 0.0
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}, expected one of {', '.join(PRIORITIES)}")
+
+        start = time.monotonic()
+        waiter_id = self.enqueue(page_type, priority)
+        announced = False
+        try:
+            while True:
+                delay = self.try_take(page_type, priority, waiter_id)
+                if not delay:
+                    break
+
+                depth = self.queue_depth(page_type)
+                with self.lock:
+                    self.max_depth[page_type] = max(self.max_depth[page_type], depth)
+                if not announced and delay > 1 and status:
+                    status(f"Rate limit: waiting for a {page_type} page slot ({depth} queued)")
+                    announced = True
+
+                # Re-check at least every half second; other processes share the bucket
+                time.sleep(min(delay, 0.5))
+        finally:
+            self.dequeue(waiter_id)
+
+        waited = time.monotonic() - start
+        with self.lock:
+            stats = self.waits[(page_type, priority)]
+            stats[0] += 1
+            stats[1] += waited
+            stats[2] = max(stats[2], waited)
+        return waited
+
+    # Requests currently waiting across all processes, for one page type or all of them
+    def queue_depth(self, page_type=None):
+        query = "SELECT COUNT(*) FROM waiters WHERE seen>?"
+        args = [time.time() - WAITER_TTL]
+        if page_type:
+            query += " AND page_type=?"
+            args.append(page_type)
+        with self.lock:
+            return self.conn.execute(query, args).fetchone()[0]
+
+    # Wait time and queue depth per page type and priority, for this process
+    def metrics(self):
+        with self.lock:
+            waits = {key: list(stats) for key, stats in self.waits.items()}
+            max_depth = dict(self.max_depth)
+
+        metrics = {}
+        for (page_type, priority), (requests, total_wait, max_wait) in waits.items():
+            metrics.setdefault(page_type, {'max_queue_depth': max_depth.get(page_type, 0)})[priority] = {
+                'requests': requests,
+                'total_wait': total_wait,
+                'max_wait': max_wait,
+            }
+        return metrics
+
+    def reset(self):
+        with self.lock:
+            self.waits.clear()
+            self.max_depth.clear()
+
+    # Multi-line summary of time spent waiting for the rate limiter
+    def report(self, title="Rate limiter waits"):
+        metrics = self.metrics()
+        lines = []
+        for page_type, stats in metrics.items():
+            for priority in PRIORITIES:
+                if priority in stats and stats[priority]['total_wait'] >= 0.1:
+                    s = stats[priority]
+                    lines.append(f"  {page_type} ({priority}): {s['total_wait']:.1f}s over {s['requests']} pages "
+                                 f"(max {s['max_wait']:.1f}s), up to {stats['max_queue_depth']} queued")
+        return "\n".join([title] + lines) + "\n" if lines else ""
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+shared_limiter_lock = threading.Lock()
+shared_limiter = None
+
+# One limiter per process; processes share the buckets through the database
+def get_rate_limiter():
+    global shared_limiter
+    with shared_limiter_lock:
+        if shared_limiter is None:
+            shared_limiter = RateLimiter()
+        return shared_limiter
@@ -0,0 +1,171 @@
+import random
+import threading
+import time
+from collections import defaultdict, deque
+
+class RetryPolicy:
+    """Exponential backoff with jitter, shared by everything in the scraping layer that retries.
+
+    The delay before retry n (0-based) is base_delay * multiplier**n capped at
+    max_delay, with up to jitter of it (0.5 = half) taken off at random so workers that
+    failed together don't retry together.
+    """
+
+    def __init__(self, attempts=3, base_delay=0.5, multiplier=2.0, max_delay=8.0, jitter=0.5):
+        self.attempts = max(1, int(attempts))
+        self.base_delay = base_delay
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def delay(self, attempt):
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** attempt)
+        return delay - random.uniform(0, delay * self.jitter)
+
+    def sleep(self, attempt):
+        time.sleep(self.delay(attempt))
+
+    # Call func() until it succeeds, backing off between attempts; the last failure is raised
+    def call(self, func, retry_on=(Exception,), on_retry=None):
+        for attempt in range(self.attempts):
+            try:
+                return func()
+            except retry_on as e:
+                if attempt == self.attempts - 1:
+                    raise
+                if on_retry:
+                    on_retry(attempt, e)
+                self.sleep(attempt)
+
+# Value at fraction q (0-1) of a list of numbers, nearest rank
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+class AdaptiveTimeouts:
+    """Wait timeouts per stage, derived from how long successful waits actually took.
+
+    Until a stage has min_samples successful waits its hard-coded timeout is used.
+    After that the timeout is multiplier times the quantile latency of the last window
+    waits, kept between floor and ceiling times the hard-coded one, so waits stretch when
+    the site slows down. Only waits whose timeout is a failure get shrunk (shrink=True);
+    where timing out is itself the answer (a part that doesn't fit) a shorter timeout
+    would turn a slow page into a wrong answer. Shared by a scraper and its workers.
+    """
+
+    def __init__(self, quantile=0.95, multiplier=3.0, floor=0.25, ceiling=2.0, min_samples=10, window=200):
+        self.quantile = quantile
+        self.multiplier = multiplier
+        self.floor = floor
+        self.ceiling = ceiling
+        self.min_samples = min_samples
+        self.lock = threading.Lock()
+        self.samples = defaultdict(lambda: deque(maxlen=window))
+        self.defaults = {}
+
+    # Record how long a successful wait took
+    def observe(self, stage, seconds):
+        with self.lock:
+            self.samples[stage].append(seconds)
+
+    def timeout(self, stage, default, shrink=True):
+        with self.lock:
+            self.defaults[stage] = (default, shrink)
+            samples = list(self.samples.get(stage, ()))
+        if len(samples) < self.min_samples:
+            return default
+        adapted = percentile(samples, self.quantile) * self.multiplier
+        floor = self.floor if shrink else 1.0
+        return min(default * self.ceiling, max(default * floor, adapted))
+
+    # One line per adapted stage: timeout in use and the latency it came from
+    def report(self, title="Adaptive timeouts"):
+        with self.lock:
+            stages = {stage: list(samples) for stage, samples in self.samples.items()}
+            defaults = dict(self.defaults)
+
+        lines = []
+        for stage, samples in stages.items():
+            if stage in defaults and len(samples) >= self.min_samples:
+                default, shrink = defaults[stage]
+                timeout = self.timeout(stage, default, shrink)
+                if timeout == default:
+                    continue
+                lines.append(f"  {stage}: {timeout:.1f}s "
+                             f"(p{self.quantile * 100:.0f} {percentile(samples, self.quantile):.2f}s, "
+                             f"was {default:.0f}s)")
+        return "\n".join([title] + lines) + "\n" if lines else ""
+
+class CircuitBreaker:
+    """Pauses every worker when the site looks like it's throttling us.
+
+    After threshold consecutive failures (page loads or required waits timing out,
+    HTTP 429/503) the breaker opens and wait() blocks all callers for cooldown seconds.
+    Then one caller goes ahead as a probe: its next success closes the breaker, a
+    failure opens it again for twice as long (up to max_cooldown).
+    """
+
+    def __init__(self, threshold=5, cooldown=30.0, max_cooldown=300.0, status_callback=None):
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.status_callback = status_callback
+        self.condition = threading.Condition()
+        self.state = "closed"
+        self.failures = 0
+        self.cooldown = cooldown
+        self.open_until = 0.0
+        self.probe_started = 0.0
+        self.opened = 0
+        self.paused = 0.0
+
+    # Block while the breaker is open; after the cooldown the first caller goes on as the probe
+    def wait(self):
+        start = time.monotonic()
+        with self.condition:
+            while True:
+                now = time.monotonic()
+                if self.state == "closed":
+                    break
+                if self.state == "open" and now >= self.open_until:
+                    self.state = "half-open"
+                    self.probe_started = now
+                    break
+                # A probe that never reported back doesn't hold everyone up for good
+                if self.state == "half-open" and now - self.probe_started > self.base_cooldown:
+                    self.probe_started = now
+                    break
+                remaining = self.open_until - now if self.state == "open" else self.base_cooldown
+                self.condition.wait(min(remaining, self.base_cooldown))
+            waited = time.monotonic() - start
+            self.paused += waited if waited > 0.01 else 0.0
+
+    def success(self):
+        with self.condition:
+            self.failures = 0
+            if self.state != "closed":
+                self.state = "closed"
+                self.cooldown = self.base_cooldown
+                self.condition.notify_all()
+
+    def failure(self):
+        with self.condition:
+            self.failures += 1
+            if self.state == "half-open" or (self.state == "closed" and self.failures >= self.threshold):
+                self.trip()
+
+    def trip(self):
+        cooldown = self.cooldown
+        self.state = "open"
+        self.open_until = time.monotonic() + cooldown
+        self.cooldown = min(self.max_cooldown, cooldown * 2)
+        self.failures = 0
+        self.opened += 1
+        if self.status_callback:
+            self.status_callback(f"Site looks throttled, pausing all workers for {cooldown:.0f}s")
+
+    def report(self):
+        with self.condition:
+            if not self.opened:
+                return ""
+            return f"Circuit breaker: opened {self.opened} times, workers paused {self.paused:.0f}s in total\n"
@@ -0,0 +1,204 @@
+"""Which model years of a buyer's guide row get checked on the site.
+
+The buyer's guide lists vehicles as year ranges, but a catalog check is for one
+year. Checking only the last year and applying its position and footnotes to the
+whole range misses fitment that changes part way through. A year strategy picks
+which years to check:
+
+    end     the last year only (one check per row, the original behaviour)
+    ends    the first and last year
+    bisect  the first and last year, then the middle of every span whose ends
+            disagree, until each change is pinned between two adjacent years
+    all     every year in the range
+
+Years that weren't checked take the result of the nearest checked year (the later
+one on a tie), and runs of years with the same result become one row, so a range
+whose years disagree is split into several rows.
+
+All vehicles' checks for a round go to the worker pool together, so extra years
+cost wall-clock time only when there are more checks than browser sessions.
+"""
+import math
+import os
+import threading
+
+YEAR_STRATEGIES = ("end", "ends", "bisect", "all")
+
+# Default year strategy, override with YEAR_STRATEGY
+YEAR_STRATEGY = os.environ.get("YEAR_STRATEGY", "end")
+
+# (start, end) years of a buyer's guide row as ints, None when they aren't years
+def year_span(vehicle):
+    try:
+        start, end = int(str(vehicle['start_year']).strip()), int(str(vehicle['end_year']).strip())
+    except (TypeError, ValueError):
+        return None
+    return min(start, end), max(start, end)
+
+# The row narrowed to a single year, for checking that year on the site
+def year_vehicle(vehicle, year):
+    return dict(vehicle, start_year=str(year), end_year=str(year))
+
+# Years a strategy checks before looking at any results
+def initial_years(strategy, start, end):
+    if strategy not in YEAR_STRATEGIES:
+        raise ValueError(f"Unknown year strategy {strategy!r}, expected one of {', '.join(YEAR_STRATEGIES)}")
+    if strategy == "end":
+        return [end]
+    if strategy == "all":
+        return list(range(start, end + 1))
+    return sorted({start, end})
+
+# The single-year rows a strategy's first round checks, for planning checks ahead of time
+def initial_vehicles(strategy, vehicles):
+    for vehicle in vehicles:
+        span = year_span(vehicle)
+        if span is None:
+            yield vehicle
+        else:
+            for year in initial_years(strategy, *span):
+                yield year_vehicle(vehicle, year)
+
+# Bisect: the middle year of every gap between neighbouring checked years that disagree
+def next_years(results):
+    years = sorted(results)
+    return [
+        (low + high) // 2
+        for low, high in zip(years, years[1:])
+        if high - low > 1 and results[low] != results[high]
+    ]
+
+# Worst case bisect checks per round for a span, assuming every gap disagrees
+def bisect_rounds(start, end):
+    rounds = [len(initial_years("bisect", start, end))]
+    gaps = [(start, end)] if end - start > 1 else []
+    while gaps:
+        rounds.append(len(gaps))
+        split = []
+        for low, high in gaps:
+            middle = (low + high) // 2
+            split.extend(gap for gap in ((low, middle), (middle, high)) if gap[1] - gap[0] > 1)
+        gaps = split
+    return rounds
+
+# (fewest, most) checks per round for one row: the fewest when all its years agree
+def sample_rounds(strategy, vehicle):
+    span = year_span(vehicle)
+    if span is None:
+        return [1], [1]
+    first = len(initial_years(strategy, *span))
+    if strategy == "bisect":
+        return [first], bisect_rounds(*span)
+    return [first], [first]
+
+def estimate_cost(strategy, vehicles, workers=1):
+    """Cost model for checking vehicles with a year strategy.
+
+    Returns a dict with the fewest and most year "checks" (each one catalog search plus
+    a category page per engine) and the fewest and most "waves": rounds of checks spread
+    over the workers, which is what wall-clock time scales with.
+    """
+    workers = max(1, int(workers))
+    fewest, most = [], []
+    for vehicle in vehicles:
+        low, high = sample_rounds(strategy, vehicle)
+        for totals, rounds in ((fewest, low), (most, high)):
+            for n, checks in enumerate(rounds):
+                if n == len(totals):
+                    totals.append(0)
+                totals[n] += checks
+
+    return {
+        'checks': (sum(fewest), sum(most)),
+        'waves': (sum(math.ceil(c / workers) for c in fewest), sum(math.ceil(c / workers) for c in most)),
+    }
+
+# (low, high) -> "low" or "low-high"
+def format_range(bounds):
+    low, high = bounds
+    return str(low) if low == high else f"{low}-{high}"
+
+# Spread checked years over the whole span and merge runs with the same result.
+# Returns [(start, end, [checked years in the run])].
+def fill_years(results, start, end):
+    checked = sorted(results)
+    runs = []
+    for year in range(start, end + 1):
+        nearest = min(checked, key=lambda y: (abs(y - year), -y))
+        if runs and results[runs[-1][2][-1]] == results[nearest]:
+            runs[-1][1] = year
+            if nearest not in runs[-1][2]:
+                runs[-1][2].append(nearest)
+        else:
+            runs.append([year, year, [nearest]])
+    return [tuple(run) for run in runs]
+
+# Position and footnotes are what has to agree between years
+def result_signature(vehicle_info):
+    return vehicle_info['position'], vehicle_info['extra']
+
+# One row per run of years with the same result, with the years checked for it and their engine logs
+def merge_years(infos, span):
+    if span is None:
+        return [dict(infos[None], checked_years=[None])]
+
+    signatures = {year: result_signature(info) for year, info in infos.items()}
+    merged = []
+    for start, end, years in fill_years(signatures, *span):
+        info = dict(infos[years[-1]], start_year=str(start), end_year=str(end), checked_years=years)
+        if len(infos) > 1:
+            info['engine_log'] = [f"{year}: {line}" for year in years for line in infos[year]['engine_log']]
+        merged.append(info)
+    return merged
+
+def check_vehicles(pool, vehicles, check, strategy=YEAR_STRATEGY, status=None):
+    """Check every vehicle's years with check(scraper, vehicle) on the worker pool.
+
+    Returns one entry per vehicle, in order: a list of vehicle_info dicts covering its
+    years, or the exception raised when none of its years could be checked.
+    """
+    spans = [year_span(vehicle) for vehicle in vehicles]
+    infos = [{} for _ in vehicles]
+    tried = [set() for _ in vehicles]
+    errors = [None] * len(vehicles)
+    progress = {'done': 0, 'total': 0}
+    progress_lock = threading.Lock()
+
+    def run(scraper, task):
+        i, year = task
+        try:
+            return check(scraper, vehicles[i] if year is None else year_vehicle(vehicles[i], year))
+        finally:
+            with progress_lock:
+                progress['done'] += 1
+                if status:
+                    status(f"Processed vehicle check {progress['done']}/{progress['total']}")
+
+    tasks = []
+    for i, span in enumerate(spans):
+        years = [None] if span is None else initial_years(strategy, *span)
+        tasks.extend((i, year) for year in years)
+
+    while tasks:
+        progress['total'] += len(tasks)
+        for i, year in tasks:
+            tried[i].add(year)
+        for (i, year), outcome in zip(tasks, pool.map(run, tasks)):
+            if isinstance(outcome, Exception):
+                errors[i] = errors[i] or outcome
+            else:
+                infos[i][year] = outcome
+
+        # Only bisect looks at results to pick more years
+        tasks = []
+        if strategy == "bisect":
+            for i, span in enumerate(spans):
+                if span is not None:
+                    results = {year: result_signature(info) for year, info in infos[i].items()}
+                    # A year that failed isn't retried; its gap takes the nearest checked year
+                    tasks.extend((i, year) for year in next_years(results) if year not in tried[i])
+
+    return [
+        merge_years(info, span) if info else errors[i]
+        for i, (info, span) in enumerate(zip(infos, spans))
+    ]
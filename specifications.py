@@ -5,11 +5,34 @@ import xlsxwriter
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
+from extraction import extract_table
 
-def createSpecificationsExcel(href, driver):
+def createSpecificationsExcel(href, driver, specificationExcelPath=None, loadPage=None):
+    if not href:
+        return writeSpecificationsExcel(None, specificationExcelPath)
+
+    if loadPage:
+        loadPage(href)
+    else:
+        driver.get(href)
+
+    try:
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, 'moreinfotable')))
+        print("\nSpecifications table found. Getting rows data...")
+        table = driver.find_element(By.CLASS_NAME, 'moreinfotable')
+        rows = [(cells[0], cells[1]) for cells in extract_table(driver, table) if len(cells) >= 2]
+    except Exception as e:
+        print(f"Failed to extract specifications: {e}")
+        return False
+
+    return writeSpecificationsExcel(rows, specificationExcelPath)
+
+def writeSpecificationsExcel(rows, specificationExcelPath=None):
+    """Write (label, value) rows from a moreinfo table to specifications.xlsx; None writes an empty file"""
     # file/folder paths
-    currentPath = os.getcwd()
-    specificationExcelPath = os.path.join(os.path.join(currentPath, "results"), "specifications.xlsx")
+    if specificationExcelPath is None:
+        currentPath = os.getcwd()
+        specificationExcelPath = os.path.join(os.path.join(currentPath, "results"), "specifications.xlsx")
 
     # set up excel files to write to
     specificationWorkbook = xlsxwriter.Workbook(specificationExcelPath)
@@ -61,7 +84,7 @@ def createSpecificationsExcel(href, driver):
         # If no units found, return the original string
         return value_str, 'raw'
 
-    if not href:
+    if rows is None:
         # clear old specifications file (if it exists)
         if os.path.exists(specificationExcelPath):
             os.remove(specificationExcelPath)
@@ -71,24 +94,13 @@ def createSpecificationsExcel(href, driver):
         specificationWorkbook.close()
         print("No specification URL provided; empty file created.")
         return True
-    else:
-        driver.get(href)
 
     try:
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, 'moreinfotable')))
-        print("\nSpecifications table found. Getting rows data...")
-        table = driver.find_element(By.CLASS_NAME, 'moreinfotable')
-        rows = table.find_elements(By.TAG_NAME, 'tr')
-
         specs = defaultdict(dict)  # { "label": {"in": val, "mm": val, "raw": val} }
 
-        for row in rows:
-            cells = row.find_elements(By.TAG_NAME, 'td')
-            if not cells:
-                continue
-
-            raw_label = cells[0].text.strip()
-            value = cells[1].text.strip()
+        for raw_label, value in rows:
+            raw_label = raw_label.strip()
+            value = value.strip()
 
             # First check if label contains unit info (original logic)
             if "(IN)" in raw_label.upper():
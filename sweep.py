@@ -0,0 +1,95 @@
+"""Cross-SKU fitment sweep.
+
+The normal compatibility pass works one part at a time: for every vehicle engine it
+opens the engine, clicks into the category and filters for that one part number, so
+50 SKUs in the same category load the same engine/category page 50 times.
+
+A sweep turns that around. Every pending (part, vehicle, engine) check is grouped by
+(vehicle, engine, category), each category page is loaded once, and every part
+waiting on it is matched against the listings on that page. Results are written to
+the fitment cache, so the per-SKU compatibility pass afterwards is answered from it
+and page loads scale with vehicles instead of SKUs x vehicles.
+
+The sweep covers the years the scraper's year strategy checks first; further bisect
+rounds are left to the per-SKU pass.
+"""
+import threading
+from vehicleCompatibility import match_listing
+from sampling import initial_vehicles
+
+# Group the checks a set of parts still needs by (vehicle, engine, category).
+# parts are dicts with part_number, manufacturer, category and vehicles (from read_buyers_guide).
+def plan_sweep(scraper, parts):
+    # Every vehicle's engines, resolved once however many parts fit it
+    searches = {}
+    for part in parts:
+        for vehicle in initial_vehicles(scraper.year_strategy, part['vehicles']):
+            searches.setdefault(scraper.vehicle_search_string(vehicle), vehicle)
+
+    def resolve(worker, search_string):
+        try:
+            return worker.resolve_engines(search_string)
+        except Exception as e:
+            worker.update_status(f"Sweep: no engines for {search_string.strip()}: {e}")
+            worker.recover_driver()
+            return []
+
+    search_strings = list(searches)
+    engines = dict(zip(search_strings, scraper.get_worker_pool().map(resolve, search_strings)))
+
+    groups = {}
+    total = 0
+    for part in parts:
+        for vehicle in initial_vehicles(scraper.year_strategy, part['vehicles']):
+            search_string = scraper.vehicle_search_string(vehicle)
+            for engine in engines[search_string]:
+                total += 1
+                key = scraper.fitment_key(vehicle, engine, part['part_number'], part['manufacturer'], part['category'])
+                if scraper.fitment_cache.get(key) is not None:
+                    continue
+
+                group = groups.setdefault((search_string, engine['text'], part['category']), {
+                    'search_string': search_string,
+                    'engine': engine,
+                    'category': part['category'],
+                    'checks': [],
+                })
+                group['checks'].append((part['part_number'], part['manufacturer'], key))
+    return list(groups.values()), total
+
+def sweep_fitment(scraper, parts):
+    """Check every part's vehicles with one category page visit per (vehicle, engine, category).
+
+    Returns a dict with the number of engine "checks" the parts need, how many were
+    "pending" (not already cached), the category "pages" loaded for them and how many
+    pages "failed" (those checks are left to the normal per-SKU pass).
+    """
+    groups, total = plan_sweep(scraper, parts)
+    pending = sum(len(group['checks']) for group in groups)
+    scraper.update_status(f"Sweep: {pending} of {total} engine checks pending across {len(groups)} category pages")
+
+    progress = {'done': 0, 'failed': 0}
+    progress_lock = threading.Lock()
+
+    def check_group(worker, group):
+        try:
+            engine_displacement, listings = worker.read_engine_listings(
+                group['search_string'], group['engine'], group['category']
+            )
+        except Exception:
+            worker.recover_driver()
+            listings = None
+
+        # Only pages that were actually read get cached
+        if listings is not None:
+            for part_number, manufacturer, key in group['checks']:
+                part_info, part_fits = match_listing(listings, part_number, manufacturer)
+                worker.fitment_cache.put(key, (engine_displacement, part_info, part_fits))
+
+        with progress_lock:
+            progress['done'] += 1
+            progress['failed'] += listings is None
+            worker.update_status(f"Sweep: category page {progress['done']}/{len(groups)}")
+
+    scraper.get_worker_pool().map(check_group, groups)
+    return {'checks': total, 'pending': pending, 'pages': len(groups), 'failed': progress['failed']}
@@ -0,0 +1,105 @@
+import pytest
+import cache
+from cache import FitmentCache, EngineIndex, ResponseCache
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+# Databases under tmp_path and a clock the test moves by hand
+@pytest.fixture
+def clock(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_FOLDER", str(tmp_path))
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    return clock
+
+def test_fitment_cache_expires_entries(clock):
+    fitment = FitmentCache(ttl=60)
+    key = fitment.make_key("2014", "bmw", " 328i ", "2.0L", "Brake Pad", "p1", "ACME")
+    fitment.put(key, ("2.0L L4", "Front", True))
+    assert fitment.get(fitment.make_key("2014", "BMW", "328I", "2.0L", "BRAKE PAD", "P1", "acme")) == \
+        ("2.0L L4", "Front", True)
+
+    clock.now += 61
+    assert fitment.get(key) is None
+    assert (fitment.hits, fitment.misses) == (1, 1)
+    fitment.close()
+
+def test_fitment_cache_bypass_trusts_only_its_own_results(clock):
+    earlier = FitmentCache()
+    key = earlier.make_key("2014", "BMW", "328I", "2.0L", "Brake Pad", "P1", "ACME")
+    other = earlier.make_key("2014", "BMW", "335I", "3.0L", "Brake Pad", "P1", "ACME")
+    earlier.put(key, ("2.0L L4", "Front", True))
+    earlier.put(other, ("3.0L L6", "", False))
+    earlier.close()
+
+    bypassing = FitmentCache(bypass=True)
+    assert bypassing.get(key) is None
+    bypassing.put(key, ("2.0L L4", "Rear", True))
+    assert bypassing.get(key) == ("2.0L L4", "Rear", True)
+    assert bypassing.get(other) is None
+    bypassing.close()
+
+SITE = "https://www.example.com"
+ENGINES = [{'index': 1, 'text': '2.0L', 'url': f"{SITE}/en/catalog/engine"}]
+
+def test_engine_index_evicts_least_recently_used(clock):
+    index = EngineIndex(max_entries=2)
+    index.put(SITE, "2014 BMW 328I", ENGINES)
+    clock.now += 1
+    index.put(SITE, "2014 BMW 335I", ENGINES)
+    clock.now += 1
+    assert index.get(SITE, "2014  bmw 328i") == ENGINES
+    clock.now += 1
+    index.put(SITE, "2014 BMW X3", ENGINES)
+
+    assert index.get(SITE, "2014 BMW 335I") is None
+    assert index.get(SITE, "2014 BMW 328I") == ENGINES
+    assert index.get(SITE, "2014 BMW X3") == ENGINES
+    index.close()
+
+def test_engine_index_expires_entries(clock):
+    index = EngineIndex(ttl=60)
+    index.put(SITE, "2014 BMW 328I", ENGINES)
+    clock.now += 61
+    assert index.get(SITE, "2014 BMW 328I") is None
+    index.close()
+
+def test_engine_index_is_per_site(clock):
+    index = EngineIndex()
+    index.put(SITE, "2014 BMW 328I", ENGINES)
+    assert index.get(SITE + "/", "2014 BMW 328I") == ENGINES
+    assert index.get("http://127.0.0.1:8000", "2014 BMW 328I") is None
+    index.close()
+
+def test_response_cache_evicts_least_recently_used_past_max_bytes(clock):
+    responses = ResponseCache(max_bytes=10)
+    title = responses.make_key("gpt-4o", "rules", "title prompt", temperature=0)
+    assert title == responses.make_key("gpt-4o", "rules", "title prompt", temperature=0)
+    assert title != responses.make_key("gpt-4o", "rules", "title prompt", temperature=1)
+
+    responses.put("a", "aaaa")
+    clock.now += 1
+    responses.put("b", b"bbbb")
+    clock.now += 1
+    assert responses.get("a") == "aaaa"
+    clock.now += 1
+    responses.put("c", "cccc")
+
+    assert responses.get("b") is None
+    assert responses.get("a") == "aaaa"
+    assert responses.get("c") == "cccc"
+    responses.close()
+
+def test_response_cache_bypass_misses(clock):
+    responses = ResponseCache()
+    responses.put("a", "aaaa")
+    bypassing = ResponseCache(bypass=True)
+    assert bypassing.get("a") is None
+    assert (bypassing.hits, bypassing.misses) == (0, 1)
+    responses.close()
+    bypassing.close()
@@ -0,0 +1,55 @@
+import ai
+from fitment import Fitment
+from ai import position_sides, short_description_summary, long_description_keywords
+
+def fitment(*positions):
+    return Fitment.from_rows(("BMW", "328I", "2014", position, "") for position in positions)
+
+def test_row_without_a_side_fits_both_sides():
+    rows = fitment("Front", "Rear", "Front Left").rows()
+    assert position_sides(rows) == (["Front", "Rear"], ["Left", "Right"])
+
+def test_only_named_sides_when_every_row_names_one():
+    rows = fitment("Front Left", "Rear Left").rows()
+    assert position_sides(rows) == (["Front", "Rear"], ["Left"])
+
+def test_no_sides_when_no_row_states_a_position():
+    assert position_sides(fitment("", "").rows()) == ([], [])
+    assert position_sides(fitment("", "Left").rows()) == ([], ["Left", "Right"])
+
+def test_short_description_positions_line():
+    lines = short_description_summary(fitment("Front", "Rear", "Front Left"), "Wheel Bearing")
+    assert lines[0] == "Front Rear Left Right, Front Rear Left Side Right Side."
+
+def test_includes_line_only_for_known_assemblies():
+    lines = short_description_summary(fitment("Front"), "Wheel Bearing & Hub  Assembly")
+    assert "Includes Wheel Hub and Wheel Bearing." in lines
+    assert not any(line.startswith("Includes") for line in short_description_summary(fitment("Front"), "Wheel Seal"))
+
+def test_long_description_keeps_both_sides():
+    keywords = long_description_keywords(fitment("Front", "Rear", "Front Left"), "P1", [])
+    assert {"Left", "Right", "Driver", "Passenger"} <= set(keywords)
+
+def test_long_description_without_positions_has_no_sides():
+    keywords = long_description_keywords(fitment("", ""), "P1", [])
+    assert not {"Left", "Right", "Driver", "Passenger"} & set(keywords)
+
+def test_prompts_over_budget_are_not_sent(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(ai, "PROMPT_TOKEN_BUDGET", 50)
+    def create_response(*args):
+        raise AssertionError("over-budget prompt was sent")
+    monkeypatch.setattr(ai, "create_response", create_response)
+
+    table = fitment("Front", "Rear")
+    vehicles = ai.vehicles_from_df(table.table)
+    assert ai.ai_generate_title("Wheel Hub", "", vehicles) is False
+    assert ai.ai_generate_short_description(table, "Wheel Hub", "llm") == ai.build_short_description(table, "Wheel Hub")
+    assert ai.ai_generate_long_description(table, "P1", []) == ai.build_long_description(table, "P1", [])
+
+def test_vehicle_display_strings_keep_their_case():
+    table = Fitment.from_rows([("Tesla", "Model 3", "2018-2019", "Front ABS", "AWD")])
+    vehicle = ai.vehicles_from_df(table)[0]
+    assert vehicle['title_display'] == "Tesla Model 3 2018-2019 Front ABS AWD"
+    assert ai.build_manual_title("Wheel Hub", vehicle) == "Front ABS Wheel Hub | Tesla Model 3 2018-2019(AWD)"
+    assert ai.format_vehicle_lines_from_df(table) == "2018 2019 TESLA MODEL 3 Front Abs AWD."
@@ -0,0 +1,109 @@
+import os
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import cache
+import httpScraper
+from httpScraper import HttpScraper
+from vehicleCompatibility import WebScraper
+from ratelimit import RateLimiter, PAGE_BUDGETS
+from timing import PageLoadStats
+
+SITE = os.path.join(os.path.dirname(__file__), "fixtures", "site")
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+# Saved pages served the way the site lays them out; /js/ holds pages whose content is built by JavaScript
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=SITE))
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+# A scraper run from tmp_path with its caches and rate limiter there too; require_driver records instead of starting Chrome
+@pytest.fixture
+def make_scraper(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(cache, "CACHE_FOLDER", str(tmp_path))
+    scrapers = []
+
+    def make(base_url):
+        scraper = HttpScraper(base_url=base_url, page_stats=PageLoadStats(),
+                              rate_limiter=RateLimiter(budgets={page_type: (100.0, 100) for page_type in PAGE_BUDGETS}))
+        scraper.driver_requests = 0
+        def require_driver():
+            scraper.driver_requests += 1
+        scraper.require_driver = require_driver
+        scrapers.append(scraper)
+        return scraper
+
+    yield make
+    for scraper in scrapers:
+        scraper.close()
+
+def test_search_products_parses_listing(site, make_scraper):
+    scraper = make_scraper(site)
+    assert scraper.search_products("P1") == [
+        {'part_number': 'P1', 'manufacturer': 'ACME', 'category': 'Brake Pad',
+         'moreinfo_href': f"{site}/en/moreinfo/P1.html"},
+        {'part_number': 'P1-HD', 'manufacturer': 'ACME', 'category': 'Brake Rotor', 'moreinfo_href': None},
+    ]
+    assert scraper.driver_requests == 0
+
+def test_search_products_falls_back_to_browser(site, make_scraper, monkeypatch):
+    monkeypatch.setattr(WebScraper, "search_products", lambda self, sku: ["browser", sku])
+    for base_url in (f"{site}/js", f"{site}/missing"):
+        scraper = make_scraper(base_url)
+        assert scraper.search_products("P1") == ["browser", "P1"]
+        assert scraper.driver_requests == 1
+
+def test_get_specifications_reads_table(site, make_scraper, monkeypatch):
+    written = []
+    monkeypatch.setattr(httpScraper, "writeSpecificationsExcel", lambda rows, path=None: written.append(rows))
+    scraper = make_scraper(site)
+    scraper.search_products("P1")
+
+    scraper.get_specifications(0)
+    scraper.get_specifications(1)
+    assert written == [[("Material", "Ceramic"), ("Width", "5.1 in")], None]
+
+def test_find_link(site, make_scraper):
+    scraper = make_scraper(site)
+    page = scraper.fetch(f"{site}/en/catalog/hub.html")
+    assert scraper.find_link(page, "Brake Pad") == "brake_pad.html"
+    assert scraper.find_link(page, "Brake Pad Se", exact=False) == "brake_pad_set.html"
+    assert scraper.find_link(page, "Brake Caliper") is None
+
+def test_fetch_engine_listings_follows_catalog_tree(site, make_scraper):
+    scraper = make_scraper(site)
+    engine = {'text': '2.0L', 'url': f"{site}/en/catalog/engine.html"}
+    assert scraper.fetch_engine_listings(engine, "Brake Pad") == ("2.0L L4 Turbocharged", [
+        {'part_number': 'X9', 'manufacturer': 'OTHER', 'notes': []},
+        {'part_number': 'P-1', 'manufacturer': 'ACME', 'notes': ["Front", "With Sport Package"]},
+    ])
+    assert scraper.fetch_engine_listings(engine, "Brake Caliper") is None
+
+    assert scraper.process_engine_compatibility("2014 BMW 328I", engine, "P1", "ACME", "Brake Pad") == \
+        ("2.0L L4 Turbocharged", "Front or With Sport Package", True)
+    assert scraper.process_engine_compatibility("2014 BMW 328I", engine, "P2", "ACME", "Brake Pad") == \
+        ("2.0L L4 Turbocharged", "", False)
+    assert scraper.driver_requests == 0
+
+def test_engine_listings_fall_back_to_browser(site, make_scraper, monkeypatch):
+    monkeypatch.setattr(WebScraper, "process_engine_compatibility", lambda self, *args: ("browser",) + args)
+    monkeypatch.setattr(WebScraper, "read_engine_listings", lambda self, *args: ("browser",) + args)
+    scraper = make_scraper(site)
+    engine = {'text': '2.0L', 'url': f"{site}/js/en/catalog/engine.html"}
+
+    assert scraper.fetch_engine_listings(engine, "Brake Pad") is None
+    assert scraper.process_engine_compatibility("2014 BMW 328I", engine, "P1", "ACME", "Brake Pad") == \
+        ("browser", "2014 BMW 328I", engine, "P1", "ACME", "Brake Pad")
+    assert scraper.read_engine_listings("2014 BMW 328I", engine, "Brake Pad") == \
+        ("browser", "2014 BMW 328I", engine, "Brake Pad")
+    assert scraper.driver_requests == 2
@@ -0,0 +1,63 @@
+from journal import ProgressJournal
+
+def vehicle(model, year="2014"):
+    return {'make': 'BMW', 'model': model, 'start_year': year, 'end_year': year,
+            'position': 'Front', 'extra': '', 'engine_log': []}
+
+def open_journal(path):
+    return ProgressJournal(str(path), "P1", "ACME", "Brake Pad")
+
+def test_resume_returns_recorded_work(tmp_path):
+    path = tmp_path / "compatibility.journal.jsonl"
+    journal = open_journal(path)
+    journal.record_vehicle(vehicle("328I"))
+    journal.record_engine(("2014", "BMW", "328I", "2.0L"), ("2.0L L4", "Front", True))
+    journal.close()
+
+    resumed = open_journal(path)
+    assert resumed.vehicle(vehicle("328I")) == vehicle("328I")
+    assert resumed.engine(("2014", "BMW", "328I", "2.0L")) == ("2.0L L4", "Front", True)
+    assert resumed.vehicle(vehicle("335I")) is None
+    resumed.close()
+
+def test_other_part_starts_over(tmp_path):
+    path = tmp_path / "compatibility.journal.jsonl"
+    journal = open_journal(path)
+    journal.record_vehicle(vehicle("328I"))
+    journal.close()
+
+    other = ProgressJournal(str(path), "P2", "ACME", "Brake Pad")
+    assert not other.vehicles
+    other.close()
+
+def test_torn_line_is_dropped_before_appending(tmp_path):
+    path = tmp_path / "compatibility.journal.jsonl"
+    journal = open_journal(path)
+    journal.record_vehicle(vehicle("328I"))
+    journal.close()
+
+    # A crash part way through writing the next record
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"type": "veh')
+
+    resumed = open_journal(path)
+    assert set(resumed.vehicles) == {resumed.vehicle_key(vehicle("328I"))}
+    resumed.record_vehicle(vehicle("335I"))
+    resumed.close()
+
+    reopened = open_journal(path)
+    assert reopened.vehicle(vehicle("328I")) == vehicle("328I")
+    assert reopened.vehicle(vehicle("335I")) == vehicle("335I")
+    reopened.record_vehicle(vehicle("X3"))
+    reopened.close()
+
+    again = open_journal(path)
+    assert len(again.vehicles) == 3
+    again.close()
+
+def test_finish_deletes_the_journal(tmp_path):
+    path = tmp_path / "compatibility.journal.jsonl"
+    journal = open_journal(path)
+    journal.record_vehicle(vehicle("328I"))
+    journal.finish()
+    assert not path.exists()
@@ -0,0 +1,44 @@
+import pytest
+import cache
+from ratelimit import RateLimiter, parse_budgets
+
+@pytest.fixture
+def limiter(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, "CACHE_FOLDER", str(tmp_path))
+    limiter = RateLimiter(budgets={"search": (0.001, 3)})
+    yield limiter
+    limiter.close()
+
+def test_batch_leaves_the_reserve_to_interactive(limiter):
+    batch = limiter.enqueue("search", "batch")
+    assert limiter.try_take("search", "batch", batch) == 0.0
+    assert limiter.try_take("search", "batch", batch) > 0
+    limiter.dequeue(batch)
+
+    interactive = limiter.enqueue("search", "interactive")
+    assert limiter.try_take("search", "interactive", interactive) == 0.0
+    assert limiter.try_take("search", "interactive", interactive) == 0.0
+    assert limiter.try_take("search", "interactive", interactive) > 0
+    limiter.dequeue(interactive)
+
+def test_batch_waits_while_interactive_is_queued(limiter):
+    interactive = limiter.enqueue("search", "interactive")
+    batch = limiter.enqueue("search", "batch")
+    assert limiter.queue_depth("search") == 2
+    assert limiter.try_take("search", "batch", batch) > 0
+
+    limiter.dequeue(interactive)
+    assert limiter.try_take("search", "batch", batch) == 0.0
+    limiter.dequeue(batch)
+    assert limiter.queue_depth() == 0
+
+def test_unbudgeted_pages_and_unknown_priorities(limiter):
+    assert limiter.acquire("catalog") == 0.0
+    with pytest.raises(ValueError):
+        limiter.acquire("search", "urgent")
+
+def test_parse_budgets():
+    budgets = parse_budgets("search=1.5:4, catalog=3")
+    assert budgets["search"] == (1.5, 4.0)
+    assert budgets["catalog"] == (3.0, 1.0)
+    assert budgets["moreinfo"] == (0.5, 2)
@@ -0,0 +1,69 @@
+import time
+import pytest
+from resilience import RetryPolicy, CircuitBreaker, AdaptiveTimeouts
+
+def test_retry_delay_backs_off_up_to_max_delay():
+    policy = RetryPolicy(base_delay=0.5, multiplier=2.0, max_delay=3.0, jitter=0.5)
+    for attempt, full in enumerate([0.5, 1.0, 2.0, 3.0, 3.0]):
+        for _ in range(20):
+            assert full * 0.5 <= policy.delay(attempt) <= full
+
+def test_retry_call_retries_then_raises_last_failure(monkeypatch):
+    policy = RetryPolicy(attempts=3)
+    slept = []
+    monkeypatch.setattr(policy, "sleep", slept.append)
+    calls = []
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TimeoutError("slow")
+        return "page"
+    assert policy.call(flaky, retry_on=(TimeoutError,)) == "page"
+    assert slept == [0, 1]
+
+    def broken():
+        raise TimeoutError(f"attempt {len(slept)}")
+    with pytest.raises(TimeoutError, match="attempt 4"):
+        policy.call(broken, retry_on=(TimeoutError,))
+
+    # Errors that aren't retried go straight through
+    with pytest.raises(ValueError):
+        policy.call(lambda: int("x"), retry_on=(TimeoutError,))
+    assert len(slept) == 4
+
+def test_breaker_opens_probes_and_closes():
+    breaker = CircuitBreaker(threshold=2, cooldown=0.05, max_cooldown=0.08)
+    breaker.failure()
+    assert breaker.state == "closed"
+    breaker.failure()
+    assert breaker.state == "open"
+
+    # The first caller after the cooldown goes ahead as the probe; its failure reopens for longer
+    start = time.monotonic()
+    breaker.wait()
+    assert time.monotonic() - start >= 0.04
+    assert breaker.state == "half-open"
+    breaker.failure()
+    assert (breaker.state, breaker.cooldown) == ("open", 0.08)
+
+    breaker.wait()
+    breaker.success()
+    assert (breaker.state, breaker.cooldown, breaker.opened) == ("closed", 0.05, 2)
+
+def test_breaker_success_resets_the_failure_count():
+    breaker = CircuitBreaker(threshold=2)
+    breaker.failure()
+    breaker.success()
+    breaker.failure()
+    assert breaker.state == "closed"
+
+def test_adaptive_timeouts_stretch_and_only_shrink_when_allowed():
+    timeouts = AdaptiveTimeouts(multiplier=3.0, floor=0.25, ceiling=2.0, min_samples=3)
+    assert timeouts.timeout("Part listing", 5.0) == 5.0
+    for _ in range(3):
+        timeouts.observe("Part listing", 0.1)
+        timeouts.observe("Search results", 0.1)
+        timeouts.observe("Catalog", 3.0)
+    assert timeouts.timeout("Search results", 5.0) == 1.25
+    assert timeouts.timeout("Part listing", 5.0, shrink=False) == 5.0
+    assert timeouts.timeout("Catalog", 5.0) == 9.0
@@ -0,0 +1,51 @@
+from sampling import fill_years, next_years, estimate_cost, check_vehicles, initial_years
+
+def test_initial_years():
+    assert initial_years("end", 2010, 2014) == [2014]
+    assert initial_years("ends", 2010, 2014) == [2010, 2014]
+    assert initial_years("ends", 2014, 2014) == [2014]
+    assert initial_years("all", 2010, 2012) == [2010, 2011, 2012]
+
+def test_next_years_splits_only_gaps_that_disagree():
+    assert next_years({2010: "Front", 2014: "Front"}) == []
+    assert next_years({2010: "Front", 2014: "Rear"}) == [2012]
+    assert next_years({2010: "Front", 2012: "Front", 2014: "Rear"}) == [2013]
+    assert next_years({2013: "Front", 2014: "Rear"}) == []
+
+def test_fill_years_takes_nearest_checked_year_and_merges_runs():
+    assert fill_years({2010: "Front", 2014: "Front"}, 2010, 2014) == [(2010, 2014, [2010, 2014])]
+    # 2012 is as near 2010 as 2014; the tie goes to the later year
+    assert fill_years({2010: "Front", 2014: "Rear"}, 2010, 2014) == [
+        (2010, 2011, [2010]),
+        (2012, 2014, [2014]),
+    ]
+
+def test_estimate_cost():
+    vehicles = [
+        {'start_year': "2010", 'end_year': "2014"},
+        {'start_year': "2016", 'end_year': "2016"},
+        {'start_year': "", 'end_year': ""},
+    ]
+    assert estimate_cost("end", vehicles, workers=2) == {'checks': (3, 3), 'waves': (2, 2)}
+    assert estimate_cost("all", vehicles, workers=2) == {'checks': (7, 7), 'waves': (4, 4)}
+    # 2010-2014 bisects into 2 ends, then 2012, then 2011 and 2013
+    assert estimate_cost("bisect", vehicles, workers=2) == {'checks': (4, 7), 'waves': (2, 4)}
+
+class Pool:
+    def map(self, func, items):
+        return [func(None, item) for item in items]
+
+def test_bisect_splits_a_range_where_fitment_changes():
+    checked = []
+    def check(scraper, vehicle):
+        year = int(vehicle['start_year'])
+        checked.append(year)
+        return {'start_year': vehicle['start_year'], 'end_year': vehicle['end_year'],
+                'position': "Front" if year < 2013 else "Rear", 'extra': "", 'engine_log': []}
+
+    [rows] = check_vehicles(Pool(), [{'start_year': "2010", 'end_year': "2014"}], check, strategy="bisect")
+    assert sorted(checked) == [2010, 2012, 2013, 2014]
+    assert [(row['start_year'], row['end_year'], row['position']) for row in rows] == [
+        ("2010", "2012", "Front"),
+        ("2013", "2014", "Rear"),
+    ]
@@ -0,0 +1,142 @@
+import os
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# Bumped when what a page load sample measures changes, so older baselines aren't compared
+# against new loads (version 2: driver.get only, without rate limiter or breaker waits)
+BASELINE_VERSION = 2
+
+class StageTimer:
+    """Thread-safe wall-clock samples per named stage.
+
+    Each sample can carry a baseline: the fixed sleep the old code would have spent
+    there, so the report can show how much time the condition-based waits saved.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.baselines = defaultdict(float)
+
+    def record(self, stage, seconds, baseline=0.0):
+        with self.lock:
+            self.samples[stage].append(seconds)
+            self.baselines[stage] += baseline
+
+    # Time the body of a with-block as one sample
+    @contextmanager
+    def measure(self, stage, baseline=0.0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, baseline)
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+            self.baselines.clear()
+
+    # Multi-line summary of time spent per stage
+    def report(self, title="Wait time by stage"):
+        with self.lock:
+            stages = {stage: list(samples) for stage, samples in self.samples.items()}
+            baselines = dict(self.baselines)
+
+        if not stages:
+            return ""
+
+        lines = [title]
+        total = total_baseline = 0.0
+        for stage, samples in stages.items():
+            spent = sum(samples)
+            line = f"  {stage}: {spent:.1f}s over {len(samples)} waits (avg {spent / len(samples):.2f}s)"
+            if baselines.get(stage):
+                line += f", fixed sleeps: {baselines[stage]:.1f}s"
+                total_baseline += baselines[stage]
+                total += spent
+            lines.append(line)
+
+        if total_baseline:
+            lines.append(f"  Saved vs fixed sleeps: {total_baseline - total:.1f}s")
+        return "\n".join(lines) + "\n"
+
+class PageLoadStats:
+    """Page load time and bytes transferred per page type, with and without resource filtering.
+
+    Averages from unfiltered loads are kept in baseline_path so a filtered run can
+    report what it saved even when nothing was loaded unfiltered in this session.
+    Samples are driver.get durations only, so the saving isn't skewed by queueing.
+    """
+
+    def __init__(self, baseline_path=None):
+        self.lock = threading.Lock()
+        self.baseline_path = baseline_path
+        self.samples = defaultdict(list)  # (page_type, filtered) -> [(seconds, bytes)]
+        self.baseline = {}
+        if baseline_path and os.path.exists(baseline_path):
+            try:
+                with open(baseline_path, encoding="utf-8") as f:
+                    saved = json.load(f)
+                if saved.get('version') == BASELINE_VERSION:
+                    self.baseline = saved['pages']
+            except (OSError, ValueError, AttributeError, KeyError):
+                self.baseline = {}
+
+    def record(self, page_type, filtered, seconds, transferred):
+        with self.lock:
+            self.samples[(page_type, filtered)].append((seconds, transferred))
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+
+    # Average (seconds, bytes) per page type for one filtering mode
+    def averages(self, filtered):
+        with self.lock:
+            return {
+                page_type: (sum(s for s, _ in samples) / len(samples), sum(b for _, b in samples) / len(samples))
+                for (page_type, mode), samples in self.samples.items() if mode == filtered and samples
+            }
+
+    # Remember this session's unfiltered averages for later filtered runs
+    def save_baseline(self):
+        unfiltered = self.averages(False)
+        if not unfiltered or not self.baseline_path:
+            return
+        self.baseline.update({page_type: list(avg) for page_type, avg in unfiltered.items()})
+        try:
+            os.makedirs(os.path.dirname(self.baseline_path), exist_ok=True)
+            with open(self.baseline_path, "w", encoding="utf-8") as f:
+                json.dump({'version': BASELINE_VERSION, 'pages': self.baseline}, f, indent=2)
+        except OSError:
+            pass
+
+    # Multi-line summary of page loads and what resource filtering saved
+    def report(self, title="Page loads by type"):
+        self.save_baseline()
+        filtered = self.averages(True)
+        unfiltered = self.averages(False)
+        if not filtered and not unfiltered:
+            return ""
+
+        lines = [title]
+        with self.lock:
+            counts = {key: len(samples) for key, samples in self.samples.items()}
+
+        for page_type, (seconds, transferred) in unfiltered.items():
+            lines.append(f"  {page_type}: {counts[(page_type, False)]} loads, avg {seconds:.2f}s, "
+                         f"{transferred / 1024:.0f} KB (all resources)")
+
+        for page_type, (seconds, transferred) in filtered.items():
+            count = counts[(page_type, True)]
+            line = f"  {page_type}: {count} loads, avg {seconds:.2f}s, {transferred / 1024:.0f} KB (filtered)"
+            base = unfiltered.get(page_type) or self.baseline.get(page_type)
+            if base:
+                line += (f", saved {(base[0] - seconds) * count:.1f}s and "
+                         f"{(base[1] - transferred) * count / 1024:.0f} KB")
+            lines.append(line)
+        return "\n".join(lines) + "\n"
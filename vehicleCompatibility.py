@@ -2,51 +2,283 @@ import os
 import re
 import time
 import xlsxwriter
-from fake_useragent import UserAgent
-import undetected_chromedriver as uc
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, ElementClickInterceptedException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException, ElementClickInterceptedException, WebDriverException
 from selenium.webdriver.common.action_chains import ActionChains
 from specifications import createSpecificationsExcel
+from browser import DriverPool, create_driver, set_blocked_urls, page_bytes, BLOCK_PROFILES
+from cache import FitmentCache, EngineIndex
+from timing import StageTimer, PageLoadStats
+from cache import CACHE_FOLDER
+from extraction import extract_table, extract_listings, extract_texts, extract_part_listings
+from fitment import Fitment, remember_fitment
+from sampling import YEAR_STRATEGY, check_vehicles, estimate_cost, format_range
+from journal import ProgressJournal
+from resilience import RetryPolicy, AdaptiveTimeouts, CircuitBreaker
+from ratelimit import get_rate_limiter
+
+BASE_URL = "https://www.rockauto.com"
+AUTOSUGGEST_ROWS = '//*[@id="autosuggestions[topsearchinput]"]/tbody/tr'
+
+# Wait condition: autosuggest rows are for this search and stopped changing between polls
+def autosuggest_settled(search_string):
+    year = search_string.split()[0]
+    last = {'texts': None}
+    
+    def condition(driver):
+        try:
+            rows = driver.find_elements(By.XPATH, AUTOSUGGEST_ROWS)
+            texts = [row.text for row in rows]
+        except StaleElementReferenceException:
+            return False
+        settled = len(rows) > 1 and texts == last['texts'] and any(year in text for text in texts[1:])
+        last['texts'] = texts
+        return rows if settled else False
+    return condition
+
+# Wait condition: every visible listing matches the part number typed into the filter box
+def listing_filter_applied(part_number):
+    def condition(driver):
+        try:
+            return driver.execute_script("""
+                var wanted = arguments[0];
+                var numbers = document.querySelectorAll('.listing-final-partnumber');
+                return Array.prototype.every.call(numbers, function (e) {
+                    return e.offsetParent === null ||
+                        e.textContent.replace(/[\\s-]/g, '').toUpperCase().indexOf(wanted) !== -1;
+                });
+            """, re.sub(r"[\s\-]", "", part_number).upper())
+        except WebDriverException:
+            return False
+    return condition
+
+# Wait condition: the page finished loading
+def document_ready(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+# Part numbers compare without spaces, dashes or case
+def normalize_part_number(part_number):
+    return re.sub(r"[\s\-]", "", part_number or "").upper()
+
+# Find a part among a category page's listings the way the filter box does (part number,
+# then manufacturer) and return (part_info, part_fits) with de-duplicated footnotes
+def match_listing(listings, part_number, manufacturer):
+    wanted = normalize_part_number(part_number)
+    for listing in listings:
+        if wanted in normalize_part_number(listing['part_number']) and manufacturer in (listing['manufacturer'] or ""):
+            notes = [note for note in listing['notes'] if note]
+            return " or ".join(dict.fromkeys(notes)), True
+    return "", False
 
 class WebScraper:
-    def __init__(self, storefront="Karshield", headless=False, status_callback=None):
+    def __init__(self, storefront="Karshield", headless=False, status_callback=None, workers=1, base_url=BASE_URL,
+                 fitment_cache=None, engine_index=None, bypass_cache=False, timer=None, driver_manager=None,
+                 resource_filter=True, block_profiles=None, page_stats=None, year_strategy=YEAR_STRATEGY,
+                 retry_policy=None, timeouts=None, breaker=None, rate_limiter=None, priority="batch"):
         self.storefront = storefront
+        self.base_url = base_url.rstrip("/")
         self.headless = headless
         self.status_callback = status_callback
         self.driver = None
+        self.driver_manager = driver_manager
         self.product_results = []
         self.selected_product = None
         
+        # Number of browser sessions used for per-vehicle checks (this one included)
+        self.workers = max(1, int(workers))
+        self.worker_scrapers = []
+        
+        # Scraper that reads specifications while this one checks compatibility, kept across SKUs
+        self.specs_worker = None
+        
+        # Which years of each buyer's guide row get checked (see sampling.py)
+        self.year_strategy = year_strategy
+        
+        # Progress journal of the compatibility run this scraper is working for, if any
+        self.journal = None
+        
+        # Time spent waiting on the page, per stage (shared with the workers)
+        self.timer = timer or StageTimer()
+        
+        # Backoff for retries, timeouts learned from measured waits and a breaker that
+        # pauses every worker when the site throttles us (all shared with the workers)
+        self.retry = retry_policy or RetryPolicy()
+        self.timeouts = timeouts or AdaptiveTimeouts()
+        self.breaker = breaker or CircuitBreaker(status_callback=status_callback)
+        
+        # Page loads per type are paced by token buckets shared with every other scraper and
+        # process; "interactive" (GUI) scrapers go ahead of "batch" ones
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.priority = priority
+        
+        # Block images, fonts and third-party scripts per page type, and track what it saves
+        self.resource_filter = resource_filter
+        self.block_profiles = block_profiles or BLOCK_PROFILES
+        self.blocked_urls = None  # patterns currently applied to self.driver
+        self.page_stats = page_stats or PageLoadStats(os.path.join(CACHE_FOLDER, "page_baseline.json"))
+        
+        # Engine fitment results shared with the workers and across runs
+        self.fitment_cache = fitment_cache or FitmentCache(bypass=bypass_cache)
+        self.engine_index = engine_index or EngineIndex(bypass=bypass_cache)
+        
         # File paths
         self.current_path = os.getcwd()
-        self.results_folder = os.path.join(self.current_path, "results")
+        self.set_results_folder(os.path.join(self.current_path, "results"))
+        
+        self.init_driver()
+
+    # Point the output files at a folder (batch mode uses one folder per SKU)
+    def set_results_folder(self, results_folder):
+        self.results_folder = results_folder
         self.compatibility_excel_path = os.path.join(self.results_folder, "compatibility.xlsx")
         self.extra_info_txt_path = os.path.join(self.results_folder, "extraInfo.txt")
+        self.specifications_excel_path = os.path.join(self.results_folder, "specifications.xlsx")
+        self.journal_path = os.path.join(self.results_folder, "compatibility.journal.jsonl")
         
         # Ensure results folder exists
         os.makedirs(self.results_folder, exist_ok=True)
-        
-        self.init_driver()
 
-    # Initialize the Chrome driver
+    # Initialize the Chrome driver, borrowing a warm session when there's a driver manager
     def init_driver(self):
         self.update_status("Initializing browser...")
         
-        ua = UserAgent()
-        options = uc.ChromeOptions()
-        options.add_argument(f'user-agent={ua.random}')
-        options.add_argument("--disable-blink-features=AutomationControlled")
+        if self.driver_manager:
+            self.driver = self.driver_manager.acquire(self.headless)
+        else:
+            self.driver = create_driver(self.headless)
+        self.blocked_urls = None
+
+    # Replace this scraper's browser (after a crash or once it has loaded too many pages)
+    def restart_driver(self, broken=True):
+        self.release_driver(broken)
+        self.init_driver()
+
+    # Give the browser back to the driver manager, or quit it
+    def release_driver(self, broken=False):
+        if not self.driver:
+            return
         
-        if self.headless:
-            options.add_argument("--headless")
-            
-        self.driver = uc.Chrome(options=options, service=Service(ChromeDriverManager().install()))
+        if self.driver_manager:
+            self.driver_manager.release(self.driver, broken)
+        else:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+        self.driver = None
+
+    # True when the browser still responds
+    def driver_alive(self):
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    # After a failed check: replace a dead browser so this worker can take the next one
+    def recover_driver(self):
+        if self.driver and not self.driver_alive():
+            try:
+                self.restart_driver()
+            except Exception:
+                pass
+
+    # Load a page, recycling a session that has used up its page budget first
+    def get_page(self, url, page_type="catalog"):
+        if self.driver_manager:
+            if self.driver_manager.needs_recycle(self.driver):
+                self.restart_driver(broken=False)
+            self.driver_manager.record_page(self.driver)
+        
+        # Switch the session's blocked URL patterns to this page type's profile
+        patterns = self.block_profiles.get(page_type, []) if self.resource_filter else []
+        if patterns != self.blocked_urls:
+            try:
+                set_blocked_urls(self.driver, patterns)
+                self.blocked_urls = patterns
+            except WebDriverException:
+                pass
+        
+        # Every attempt holds off while the breaker is open; a load that times out is retried with backoff.
+        # Only driver.get is timed, so waiting on the breaker or rate limiter isn't counted as load time
+        def load():
+            self.breaker.wait()
+            self.rate_limiter.acquire(page_type, self.priority, self.update_status)
+            start = time.perf_counter()
+            try:
+                self.driver.get(url)
+            except TimeoutException:
+                self.breaker.failure()
+                raise
+            self.breaker.success()
+            return time.perf_counter() - start
+        
+        seconds = self.retry.call(load, retry_on=(TimeoutException,))
+        try:
+            self.page_stats.record(page_type, bool(self.blocked_urls), seconds, page_bytes(self.driver))
+        except WebDriverException:
+            pass
+
+    # Settings a worker scraper inherits from this one
+    def worker_options(self):
+        return dict(
+            storefront=self.storefront,
+            headless=self.headless,
+            status_callback=self.status_callback,
+            base_url=self.base_url,
+            fitment_cache=self.fitment_cache,
+            driver_manager=self.driver_manager,
+            engine_index=self.engine_index,
+            timer=self.timer,
+            resource_filter=self.resource_filter,
+            block_profiles=self.block_profiles,
+            page_stats=self.page_stats,
+            year_strategy=self.year_strategy,
+            retry_policy=self.retry,
+            timeouts=self.timeouts,
+            breaker=self.breaker,
+            rate_limiter=self.rate_limiter,
+            priority=self.priority
+        )
+
+    # Create an extra scraper with its own browser for the worker pool
+    def create_worker(self):
+        return type(self)(**self.worker_options())
+
+    # Get a pool of browser sessions (this scraper plus workers-1 extra ones)
+    def get_worker_pool(self):
+        while len(self.worker_scrapers) < self.workers - 1:
+            self.worker_scrapers.append(self.create_worker())
+        return DriverPool([self] + self.worker_scrapers)
+
+    # The specifications scraper, created on first use and reused for every later SKU
+    def get_specs_worker(self):
+        if self.specs_worker is None:
+            self.specs_worker = self.create_worker()
+        return self.specs_worker
+
+    # Wait for a condition and record how long it took under the given stage. timeout is the
+    # default until the stage has enough samples to adapt it. A required wait that times out
+    # counts as a failure for the circuit breaker and may get a shorter timeout; others can
+    # time out as a normal answer ("doesn't fit"), so their timeout is only ever stretched.
+    def wait_for(self, condition, stage, timeout=10, baseline=0.0, required=False):
+        timeout = self.timeouts.timeout(stage, timeout, shrink=required)
+        start = time.perf_counter()
+        try:
+            with self.timer.measure(stage, baseline):
+                result = WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(condition)
+        except TimeoutException:
+            if required:
+                self.breaker.failure()
+            raise
+        
+        self.timeouts.observe(stage, time.perf_counter() - start)
+        if required:
+            self.breaker.success()
+        return result
 
     # Update status if callback is provided
     def update_status(self, message):
@@ -57,16 +289,13 @@ class WebScraper:
     def search_products(self, sku):
         self.update_status(f"Searching for SKU: {sku}")
         
-        website = f"https://www.rockauto.com/en/partsearch/?partnum={sku}"
-        self.driver.get(website)
+        website = f"{self.base_url}/en/partsearch/?partnum={sku}"
+        self.get_page(website, "search")
         
         try:
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, 'listings-container'))
-            )
-            all_results = self.driver.find_elements(
-                By.XPATH, '//*[contains(@class, "listing-border-top-line listing-inner-content")]'
-            )
+            self.wait_for(EC.presence_of_element_located((By.CLASS_NAME, 'listings-container')), "Search results")
+            # Every listing's fields in one round-trip
+            all_results = extract_listings(self.driver)
             
             if not all_results:
                 raise TimeoutException("No results found")
@@ -76,15 +305,15 @@ class WebScraper:
         
         self.product_results = []
         for result in all_results:
-            try:
-                self.product_results.append(
-                    dict(part_number = result.find_element(By.CLASS_NAME, "listing-final-partnumber").text,
-                         manufacturer = result.find_element(By.CLASS_NAME, "listing-final-manufacturer").text,
-                         category = re.split(r"\s[\(\[].*$", result.find_element(By.CLASS_NAME, "listing-text-row").text[10:])[0].strip(), element=result,
-                    )
-                )
-            except NoSuchElementException:
+            if result['part_number'] is None or result['manufacturer'] is None or result['text_row'] is None:
                 continue
+            self.product_results.append(
+                dict(part_number = result['part_number'],
+                     manufacturer = result['manufacturer'],
+                     category = re.split(r"\s[\(\[].*$", result['text_row'][10:])[0].strip(),
+                     moreinfo_href = result['moreinfo_href'],
+                )
+            )
         
         return self.product_results
 
@@ -97,15 +326,16 @@ class WebScraper:
         
         try:
             product = self.product_results[product_index]
-            info_href = product['element'].find_element(By.CLASS_NAME, 'ra-btn-moreinfo').get_attribute('href')
-            createSpecificationsExcel(info_href, self.driver)
+            info_href = product['moreinfo_href']
+            createSpecificationsExcel(info_href, self.driver, self.specifications_excel_path,
+                                      loadPage=lambda href: self.get_page(href, "moreinfo"))
             
         except Exception as e:
             # If specifications fail, continue with compatibility
             self.update_status(f"Specifications failed: {str(e)}")
 
-    # Get compatibility information for the selected product
-    def get_compatibility(self, product_index):
+    # Open a listing's buyer's guide popup: (part number, manufacturer, category, vehicles)
+    def read_buyers_guide(self, product_index):
         if product_index >= len(self.product_results):
             raise Exception("Invalid product index for compatibility")
         
@@ -113,154 +343,204 @@ class WebScraper:
         
         # Go back to original search, reload listing page (avoid stale elements)
         sku = self.selected_product['part_number']
-        website = f"https://www.rockauto.com/en/partsearch/?partnum={sku}"
-        self.driver.get(website)
-        
-        WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, 'listings-container'))
-        )
-        
-        # Re-fetch elements to avoid stale references
-        all_results = self.driver.find_elements(
-            By.XPATH, '//*[contains(@class, "listing-border-top-line listing-inner-content")]'
-        )
-        
-        if product_index >= len(all_results):
+        website = f"{self.base_url}/en/partsearch/?partnum={sku}"
+        self.get_page(website, "search")
+        
+        self.wait_for(EC.presence_of_element_located((By.CLASS_NAME, 'listings-container')), "Search results",
+                      required=True)
+        
+        # Re-fetch the listings in one query and click the one the details come from. search_products
+        # skips incomplete listings, so the product is found by part number and manufacturer, not index
+        chosen_listing = next((
+            listing for listing in extract_listings(self.driver)
+            if listing['part_number'] == self.selected_product['part_number']
+            and listing['manufacturer'] == self.selected_product['manufacturer']
+        ), None)
+        if chosen_listing is None or chosen_listing['part_link'] is None:
             raise Exception("Product no longer available")
         
-        chosen_result = all_results[product_index]
-        
         # Get product details
-        chosen_part_number = chosen_result.find_element(By.CLASS_NAME, 'listing-final-partnumber').text
-        chosen_manufacturer = chosen_result.find_element(By.CLASS_NAME, 'listing-final-manufacturer').text
-        category_raw = chosen_result.find_element(By.CLASS_NAME, 'listing-text-row').text
+        chosen_part_number = chosen_listing['part_number']
+        chosen_manufacturer = chosen_listing['manufacturer']
+        category_raw = chosen_listing['text_row'] or ""
         chosen_category = re.split(r'\s[\(\[].*$', category_raw[10:])[0].strip()
         
         # Open compatibility popup
         self.update_status("Getting vehicle compatibility...")
-        part_link = chosen_result.find_element(By.XPATH, './/*[contains(@id, "vew_partnumber")]')
-        part_link.click()
+        chosen_listing['part_link'].click()
         
-        WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, '//*[@id="buyersguidepopup-outer_b"]/div/div/table'))
+        self.wait_for(
+            EC.presence_of_element_located((By.XPATH, '//*[@id="buyersguidepopup-outer_b"]/div/div/table')),
+            "Buyer's guide", required=True
         )
         
-        compatible_vehicles = self.driver.find_elements(
-            By.XPATH, '//*[@id="buyersguidepopup-outer_b"]/div/div/table/tbody/tr'
-        )
+        # Whole fitment table in one round-trip
+        compatible_vehicles = extract_table(
+            self.driver, '//*[@id="buyersguidepopup-outer_b"]/div/div/table'
+        ) or []
         
         # Extract vehicle information
         vehicles = []
-        for vehicle in compatible_vehicles:
-            try:
-                make = vehicle.find_element(By.XPATH, './td[1]').text
-                model = vehicle.find_element(By.XPATH, './td[2]').text
-                years = vehicle.find_element(By.XPATH, './td[3]').text
-                
-                if "-" in years:
-                    start_year, end_year = years.split("-")
-                else:
-                    start_year = end_year = years
-                
-                vehicles.append({
-                    'make': make,
-                    'model': model,
-                    'start_year': start_year,
-                    'end_year': end_year,
-                    'position': "",
-                    'extra': ""
-                })
-                
-            except NoSuchElementException:
+        for cells in compatible_vehicles:
+            # Skip header rows and anything without make / model / years cells
+            if len(cells) < 3:
                 continue
+            make, model, years = cells[0], cells[1], cells[2]
+            
+            if "-" in years:
+                start_year, end_year = years.split("-")
+            else:
+                start_year = end_year = years
+            
+            vehicles.append({
+                'make': make,
+                'model': model,
+                'start_year': start_year,
+                'end_year': end_year,
+                'position': "",
+                'extra': ""
+            })
         
         # Close dialog/popup
         try:
-            WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.CLASS_NAME, 'dialog-close'))
-            ).click()
+            self.wait_for(EC.element_to_be_clickable((By.CLASS_NAME, 'dialog-close')), "Close dialog").click()
         except TimeoutException:
             pass
         
+        return chosen_part_number, chosen_manufacturer, chosen_category, vehicles
+
+    # Get compatibility information for the selected product
+    def get_compatibility(self, product_index):
+        chosen_part_number, chosen_manufacturer, chosen_category, vehicles = self.read_buyers_guide(product_index)
+        compatible_rows = []
+        
         # Process each vehicle for detailed compatibility
         self.update_status("Processing vehicle compatibility...")
+        cache_hits, cache_misses = self.fitment_cache.hits, self.fitment_cache.misses
+        self.timer.reset()
+        self.page_stats.reset()
+        self.rate_limiter.reset()
         
         results_text = f"Compatibility Results for {chosen_part_number}\n"
         results_text += f"Manufacturer: {chosen_manufacturer}\n"
         results_text += f"Category: {chosen_category}\n"
         results_text += "=" * 80 + "\n\n"
         
-        # Setup Excel file
-        self.setup_excel_file()
+        # Vehicles and engines finished by an earlier run of this part that didn't complete
+        journal = ProgressJournal(self.journal_path, chosen_part_number, chosen_manufacturer, chosen_category)
+        if journal.vehicles:
+            self.update_status(f"Resuming: {len(journal.vehicles)} vehicle checks already done")
         
-        for i, vehicle in enumerate(vehicles):
-            self.update_status(f"Processing vehicle {i+1}/{len(vehicles)}")
+        # Check vehicles in parallel across the pool; results come back in popup order
+        pool = self.get_worker_pool()
+        
+        def check_vehicle(scraper, vehicle):
+            finished = journal.vehicle(vehicle)
+            if finished is not None:
+                return finished
             
             try:
-                vehicle_info = self.process_vehicle_compatibility(
+                scraper.journal = journal
+                vehicle_info = scraper.process_vehicle_compatibility(
                     vehicle, chosen_part_number, chosen_manufacturer, chosen_category
                 )
+                journal.record_vehicle(vehicle_info)
+                return vehicle_info
+            except Exception as e:
+                scraper.recover_driver()
+                return e
+            finally:
+                scraper.journal = None
+        
+        cost = estimate_cost(self.year_strategy, vehicles, len(pool))
+        self.update_status(f"Processing {len(vehicles)} vehicles with {len(pool)} browser sessions, "
+                           f"{format_range(cost['checks'])} year checks ({self.year_strategy} strategy)...")
+        try:
+            outcomes = check_vehicles(pool, vehicles, check_vehicle, self.year_strategy, self.update_status)
+        except Exception:
+            journal.close()
+            raise
+        
+        # Setup Excel file (only now, so a crashed run leaves the last complete one in place)
+        self.setup_excel_file()
+        
+        row_index = 0
+        failed = 0
+        checked_years = 0
+        for vehicle, vehicle_infos in zip(vehicles, outcomes):
+            try:
+                if isinstance(vehicle_infos, Exception):
+                    raise vehicle_infos
                 
-                # Write to Excel
-                self.write_vehicle_to_excel(i, vehicle_info)
-                
-                # Add to results text
-                year_str = vehicle_info['start_year'] if vehicle_info['start_year'] == vehicle_info['end_year'] else f"{vehicle_info['start_year']}-{vehicle_info['end_year']}"
-                results_text += f"{vehicle_info['make']} {vehicle_info['model']} ({year_str})\n"
-                results_text += f"Position: {vehicle_info['position']}\n"
-                results_text += f"Engine Info: {vehicle_info['extra']}\n"
-                results_text += "-" * 50 + "\n"
+                # A range whose years disagree comes back as one row per run of years
+                for vehicle_info in vehicle_infos:
+                    # Write to Excel
+                    self.write_vehicle_to_excel(row_index, vehicle_info)
+                    row_index += 1
+                    
+                    # Add to results text
+                    year_str = vehicle_info['start_year'] if vehicle_info['start_year'] == vehicle_info['end_year'] else f"{vehicle_info['start_year']}-{vehicle_info['end_year']}"
+                    compatible_rows.append((vehicle_info['make'], vehicle_info['model'], year_str,
+                                            vehicle_info['position'], vehicle_info['extra']))
+                    results_text += f"{vehicle_info['make']} {vehicle_info['model']} ({year_str})\n"
+                    results_text += f"Position: {vehicle_info['position']}\n"
+                    results_text += f"Engine Info: {vehicle_info['extra']}\n"
+                    results_text += "-" * 50 + "\n"
+                    checked_years += len(vehicle_info['checked_years'])
                 
             except Exception as e:
+                failed += 1
                 results_text += f"Error processing {vehicle['make']} {vehicle['model']}: {str(e)}\n"
                 results_text += "-" * 50 + "\n"
         
         # Close Excel file
         self.close_excel_file()
         
-        results_text += f"\nResults saved to: {self.compatibility_excel_path}\n"
+        # Keep the journal while any vehicle still needs checking, so a rerun only redoes those
+        if failed:
+            journal.close()
+            results_text += f"\n{failed} vehicles failed; rerun to check them, finished ones are kept in {self.journal_path}\n"
+        else:
+            journal.finish()
         
-        return results_text
+        results_text += f"\nResults saved to: {self.compatibility_excel_path}\n"
+        results_text += (f"Year checks ({self.year_strategy}): {checked_years} for {len(vehicles)} vehicles, "
+                         f"estimated {format_range(cost['checks'])} in {format_range(cost['waves'])} waves\n")
+        results_text += (f"Fitment cache: {self.fitment_cache.hits - cache_hits} hits, "
+                         f"{self.fitment_cache.misses - cache_misses} checked on site\n")
+        results_text += self.timer.report()
+        results_text += self.timeouts.report()
+        results_text += self.breaker.report()
+        results_text += self.rate_limiter.report()
+        results_text += self.page_stats.report()
+        
+        # compatibility.xlsx is only an export; callers work from this
+        fitment = Fitment.from_rows(
+            compatible_rows, text=results_text, part_number=chosen_part_number,
+            manufacturer=chosen_manufacturer, category=chosen_category, path=self.compatibility_excel_path
+        )
+        remember_fitment(fitment)
+        return fitment
 
     # Process compatibility for a single vehicle
     def process_vehicle_compatibility(self, vehicle, part_number, manufacturer, category):
-        search_string = f"{vehicle['end_year']} {vehicle['make']} {vehicle['model']} "
+        search_string = self.vehicle_search_string(vehicle)
         
-        # Navigate to catalog
-        self.driver.get("https://www.rockauto.com/en/catalog/")
-        
-        # Search for vehicle
-        try:
-            search_bar = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, '//input[@id="topsearchinput[input]"]'))
-            )
-            search_bar.clear()
-            search_bar.send_keys(search_string)
-            time.sleep(0.5)
-        except TimeoutException:
-            raise Exception(f"Timeout loading catalog for {search_string}")
-        
-        # Get engine suggestions
-        try:
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, '//*[@id="autosuggestions[topsearchinput]"]/tbody/tr'))
-            )
-            engines = self.driver.find_elements(
-                By.XPATH, '//*[@id="autosuggestions[topsearchinput]"]/tbody/tr'
-            )
-        except TimeoutException:
-            raise Exception(f"No engine suggestions found for {search_string}")
+        # Resolve every engine's catalog link from a single autosuggest pass
+        engines = self.resolve_engines(search_string)
         
         vehicle_info = vehicle.copy()
+        vehicle_info["engine_log"] = []
         
-        # Process each engine (skip index 0 ‑‑ header)
-        for j in range(1, len(engines)):
-            engine_displacement, part_info, part_fits = self.process_engine_compatibility(
-                search_string, j, part_number, manufacturer, category
+        # Process each engine
+        for engine in engines:
+            j = engine["index"]
+            engine_displacement, part_info, part_fits = self.check_engine(
+                vehicle, search_string, engine, part_number, manufacturer, category
             )
 
-            # write one line to txt file per engine
-            self.txt_file.write(
+            # one line per engine, written to the txt file with the vehicle
+            vehicle_info["engine_log"].append(
                 f"Results for engine {j} ({engine_displacement}): "
                 f"{part_info if part_info else 'No fit'}\n"
             )
@@ -301,69 +581,152 @@ class WebScraper:
 
         return vehicle_info
 
-    # Process compatibility for a specific engine
-    def process_engine_compatibility(self, search_string, engine_index, part_number, manufacturer, category):
-        # Navigate back to catalog
-        self.driver.get("https://www.rockauto.com/en/catalog/")
-        
-        # Re-enter search
-        search_bar = WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, '//input[@id="topsearchinput[input]"]'))
+    # What gets typed into the catalog search for a vehicle; also the engine index key
+    def vehicle_search_string(self, vehicle):
+        return f"{vehicle['end_year']} {vehicle['make']} {vehicle['model']} "
+
+    # Fitment cache key for one part on one vehicle engine
+    def fitment_key(self, vehicle, engine, part_number, manufacturer, category):
+        return self.fitment_cache.make_key(
+            vehicle['end_year'], vehicle['make'], vehicle['model'], engine['text'], category, part_number, manufacturer
         )
-        search_bar.clear()
-        search_bar.send_keys(search_string)
-        time.sleep(0.5)
+
+    # Check one engine, using the fitment cache when it has a fresh result
+    def check_engine(self, vehicle, search_string, engine, part_number, manufacturer, category):
+        key = self.fitment_key(vehicle, engine, part_number, manufacturer, category)
+        
+        # An interrupted run's engine results count even when the cache is bypassed
+        result = self.journal.engine(key) if self.journal else None
+        if result is not None:
+            return result
+        
+        result = self.fitment_cache.get(key)
+        if result is not None:
+            return result
+        
+        result = self.process_engine_compatibility(search_string, engine, part_number, manufacturer, category)
+        
+        # part_info is None when the listing was never reached; don't cache those
+        if result[1] is not None:
+            self.fitment_cache.put(key, result)
+            if self.journal:
+                self.journal.record_engine(key, result)
+        return result
+
+    # Search the catalog once and collect every engine row with its catalog link
+    def resolve_engines(self, search_string):
+        # Vehicles we've already indexed skip the catalog search entirely
+        engines = self.engine_index.get(self.base_url, search_string)
+        if engines is not None:
+            return engines
+        
+        rows = self.search_catalog(search_string)
+        
+        # skip index 0 ‑‑ header
+        engines = []
+        for j in range(1, len(rows)):
+            row = rows[j]
+            links = row.find_elements(By.XPATH, './/a[@href]')
+            engines.append({
+                'index': j,
+                'text': row.text.strip(),
+                'url': links[0].get_attribute('href') if links else None
+            })
+        
+        if engines:
+            self.engine_index.put(self.base_url, search_string, engines)
+        return engines
+
+    # Type a vehicle into the catalog search bar and return the autosuggest rows
+    def search_catalog(self, search_string):
+        # Navigate to catalog
+        self.get_page(f"{self.base_url}/en/catalog/", "catalog")
         
-        # Get fresh engine elements
-        WebDriverWait(self.driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, '//*[@id="autosuggestions[topsearchinput]"]/tbody/tr'))
-        )
-        engines = self.driver.find_elements(
-            By.XPATH, '//*[@id="autosuggestions[topsearchinput]"]/tbody/tr'
-        )
+        # Search for vehicle
+        try:
+            search_bar = self.wait_for(
+                EC.presence_of_element_located((By.XPATH, '//input[@id="topsearchinput[input]"]')),
+                "Catalog search bar", required=True
+            )
+            search_bar.clear()
+            search_bar.send_keys(search_string)
+        except TimeoutException:
+            raise Exception(f"Timeout loading catalog for {search_string}")
         
-        if engine_index >= len(engines):
-            return "Unknown", "", False
+        # Get engine suggestions once they've caught up with the typed search
+        try:
+            return self.wait_for(autosuggest_settled(search_string), "Autosuggest", baseline=0.5)
+        except TimeoutException:
+            raise Exception(f"No engine suggestions found for {search_string}")
+
+    # Open an engine's catalog page, directly by link when the autosuggest row had one
+    def open_engine(self, search_string, engine):
+        if engine.get('url'):
+            self.get_page(engine['url'], "catalog")
+            return True
         
-        # Click engine
-        engine = engines[engine_index]
-        engine_text = engine.text.strip()
+        # No link on the row: search again and click it
+        try:
+            rows = self.search_catalog(search_string)
+        except Exception:
+            return False
         
-        if not self.safe_click(engine):
-            return engine_text, "", False
+        if engine['index'] >= len(rows):
+            return False
         
-        # Get engine displacement
+        return self.safe_click(rows[engine['index']])
+
+    # Engine displacement from the open engine page's breadcrumb, else the autosuggest text
+    def read_engine_displacement(self, engine_text):
         try:
-            crumb = WebDriverWait(self.driver, 10).until(
+            crumb = self.wait_for(
                 EC.presence_of_element_located(
                     (By.CSS_SELECTOR, "div[id^='breadcrumb_location_banner_inner'] span.belem.active")
-                )
+                ),
+                "Engine breadcrumb"
             )
-            engine_displacement = crumb.text.strip()
+            return crumb.text.strip()
         except TimeoutException:
-            engine_displacement = engine_text
+            return engine_text
+
+    # Process compatibility for a specific engine
+    def process_engine_compatibility(self, search_string, engine, part_number, manufacturer, category):
+        engine_text = engine['text']
+        
+        if not self.open_engine(search_string, engine):
+            return engine_text or "Unknown", None, False
+        
+        # Get engine displacement
+        engine_displacement = self.read_engine_displacement(engine_text)
         
         # Navigate to category
         if not self.navigate_to_category(category):
-            return engine_displacement, "", False
+            return engine_displacement, None, False
         
         # Search for part
         try:
-            search_bar = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, 'filter-input'))
+            search_bar = self.wait_for(
+                EC.presence_of_element_located((By.CLASS_NAME, 'filter-input')), "Filter box", required=True
             )
             search_bar.clear()
             search_bar.send_keys(part_number)
             search_bar.send_keys(Keys.ENTER)
-            time.sleep(1)
         except TimeoutException:
-            return engine_displacement, "", False
+            return engine_displacement, None, False
+        
+        # Let the listing filter apply; a filter that matches nothing still falls through
+        try:
+            self.wait_for(listing_filter_applied(part_number), "Listing filter", timeout=5, baseline=1.0)
+        except TimeoutException:
+            pass
         
         # Check if part fits
         try:
-            part_listing = WebDriverWait(self.driver, 5).until(
+            # Timing out here is the usual "doesn't fit" answer, so the timeout never drops below 5s
+            part_listing = self.wait_for(
                 EC.presence_of_element_located((By.XPATH, 
-                    f"//td[contains(@class, 'listing-inner-content')][.//span[contains(@class, 'listing-final-manufacturer') and contains(text(), '{manufacturer}')]]"))
+                    f"//td[contains(@class, 'listing-inner-content')][.//span[contains(@class, 'listing-final-manufacturer') and contains(text(), '{manufacturer}')]]")),
+                "Part listing", timeout=5
             )
             part_fits = True
         except TimeoutException:
@@ -374,15 +737,36 @@ class WebScraper:
         part_info = ""
         if part_listing:
             try:
-                notes = [e.text.strip()
-                         for e in part_listing.find_elements(By.CLASS_NAME, "listing-footnote-text")
-                         if e.text.strip()]
+                notes = [note for note in extract_texts(self.driver, part_listing, ".listing-footnote-text") if note]
                 part_info = " or ".join(dict.fromkeys(notes))  # de-dupe + preserve order
-            except NoSuchElementException:
+            except WebDriverException:
                 pass
 
         return engine_displacement, part_info, part_fits
 
+    # Open an engine's category page and read every listing on it, for checking many parts
+    # in one visit. Returns (engine_displacement, listings), listings None if the page wasn't reached.
+    def read_engine_listings(self, search_string, engine, category):
+        engine_text = engine['text']
+        
+        if not self.open_engine(search_string, engine):
+            return engine_text or "Unknown", None
+        
+        engine_displacement = self.read_engine_displacement(engine_text)
+        
+        if not self.navigate_to_category(category):
+            return engine_displacement, None
+        
+        try:
+            self.wait_for(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "td[class*='listing-inner-content']")),
+                "Category listings"
+            )
+        except TimeoutException:
+            return engine_displacement, None
+        
+        return engine_displacement, extract_part_listings(self.driver)
+
     # Safely click an element with multiple fallback strategies
     def safe_click(self, element):
         try:
@@ -399,27 +783,33 @@ class WebScraper:
                 except:
                     return False
 
-    # Navigate to part category with retry logic
-    def navigate_to_category(self, category, max_retries=3):
-        for attempt in range(max_retries):
+    # Navigate to part category, retrying with the scraper's backoff policy
+    def navigate_to_category(self, category):
+        for attempt in range(self.retry.attempts):
+            if attempt:
+                self.retry.sleep(attempt - 1)
             try:
                 # Click "Brake & Wheel Hub"
-                brake_hub_link = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'Brake & Wheel Hub')]"))
+                brake_hub_link = self.wait_for(
+                    EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'Brake & Wheel Hub')]")),
+                    "Category menu", required=True
                 )
                 if not self.safe_click(brake_hub_link):
                     continue
                 
-                time.sleep(1)
-                
-                # Click the specific category
-                category_link = WebDriverWait(self.driver, 10).until(
-                    EC.element_to_be_clickable((By.XPATH, f"//a[normalize-space(text()) = '{category}']"))
+                # Click the specific category once the subtree has opened
+                category_link = self.wait_for(
+                    EC.element_to_be_clickable((By.XPATH, f"//a[normalize-space(text()) = '{category}']")),
+                    "Category tree", baseline=1.0
                 )
                 return self.safe_click(category_link)
                 
             except TimeoutException:
-                time.sleep(2)
+                # Let the page settle before retrying
+                try:
+                    self.wait_for(document_ready, "Category retry", baseline=2.0)
+                except TimeoutException:
+                    pass
         
         return False
 
@@ -483,6 +873,8 @@ class WebScraper:
         self.compatibility_worksheet.write(row, 4, vehicle_info['extra'], self.cell_format)
         
         # Write to text file
+        for line in vehicle_info.get('engine_log', []):
+            self.txt_file.write(line)
         self.txt_file.write(f"{vehicle_info['make']} {vehicle_info['model']} ({year_str}): {vehicle_info['extra']}\n")
         self.txt_file.write("-" * 50 + "\n")
 
@@ -495,8 +887,21 @@ class WebScraper:
 
     # Close the webscraper and cleanup resources
     def close(self):
-        if self.driver:
-            self.driver.quit()
+        self.release_driver()
+        
+        for worker in self.worker_scrapers:
+            try:
+                worker.close()
+            except:
+                pass
+        self.worker_scrapers = []
+        
+        if self.specs_worker:
+            try:
+                self.specs_worker.close()
+            except:
+                pass
+            self.specs_worker = None
         
         if hasattr(self, 'compatibility_workbook'):
             try: